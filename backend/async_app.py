@@ -0,0 +1,349 @@
+"""ASGI entry point that serves the read-heavy endpoints on asyncio.
+
+    DATABASE_URL=mysql+pymysql://... uvicorn async_app:application
+
+The Flask app blocks one thread per in-flight request, so a process can only
+wait on as many queries as it has threads. Here the list routes (including
+NDJSON streaming), /pets/<id>/popularity, /pets/popularity-scores,
+/pets/multiple-attempts and /volunteer-schedules/check run as coroutines on
+SQLAlchemy's asyncio engine, so one process can keep many more of them
+waiting on the database. Every other request, writes included, is handed to
+the Flask app on a worker thread.
+
+Each request runs inside a Flask request context, so routing, argument
+parsing, before/after_request hooks (CORS, instrumentation), ETags, the cache
+and the serializers are the Flask app's own, and responses match the threaded
+server. Writes bridged to Flask run in this process and bump the same cache
+generations. Lifespan startup also starts the outbox replicator
+(REPLICATION_ENABLED). Run several processes only with CACHE_REDIS_URL set,
+as for several Flask workers.
+
+The asyncio engine needs greenlet and an async driver: aiomysql for MySQL,
+aiosqlite for SQLite (``pip install sqlalchemy[asyncio] aiomysql aiosqlite``).
+The async URL is derived from DATABASE_URL; set ASYNC_DATABASE_URL to
+override it.
+"""
+import asyncio
+import io
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Response, jsonify, request
+from sqlalchemy.engine import make_url
+
+try:
+    from sqlalchemy.ext.asyncio import create_async_engine
+except ImportError:
+    # greenlet is missing; reported when the app starts
+    create_async_engine = None
+
+from app import (AdoptionApplication, Adopter, Pet, ValidationError, Volunteer, VolunteerSchedule, app,
+                 build_list_query, cache, collection_version_parts, collection_version_query, dumps,
+                 ensure_replicator_started, etag_for, get_replicator, json_response, list_cache_key,
+                 materialized_popularity_query, multiple_attempts_query, not_modified, not_modified_response,
+                 page_response, parse_list_params, parse_schedule_check, pet_popularity_query, pool_options,
+                 popularity_from_row, popularity_response, popularity_scores_key, ranking_version_parts,
+                 ranking_version_query, rows_to_page, schedule_check_query, serializer_for, wants_archived, wants_async, wants_stream,
+                 with_validators)
+
+logger = logging.getLogger(__name__)
+
+# Async driver per backend, for URLs that name a blocking driver
+ASYNC_DRIVERS = {
+    'mysql': 'mysql+aiomysql',
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg'
+}
+ASYNC_DRIVER_NAMES = {'aiomysql', 'asyncmy', 'aiosqlite', 'asyncpg', 'psycopg_async'}
+
+# Threads running the requests handed to Flask
+BRIDGE_THREADS = int(os.environ.get('ASYNC_BRIDGE_THREADS', 16))
+
+
+def async_database_url(url):
+    url = make_url(url)
+    if url.get_driver_name() in ASYNC_DRIVER_NAMES:
+        return url
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f"No asyncio driver known for {url.drivername}; set ASYNC_DATABASE_URL")
+    return url.set(drivername=driver)
+
+
+def async_pool_options(url):
+    # Same sizing as the Flask engine; the instrumented QueuePool is blocking,
+    # so the async engine keeps its own AsyncAdaptedQueuePool
+    options = pool_options(url)
+    options.pop('poolclass', None)
+    return options
+
+
+_engine = None
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        if create_async_engine is None:
+            raise RuntimeError("The asyncio engine requires greenlet: pip install sqlalchemy[asyncio]")
+        url = os.environ.get('ASYNC_DATABASE_URL') or async_database_url(app.config['SQLALCHEMY_DATABASE_URI'])
+        _engine = create_async_engine(url, **async_pool_options(url))
+    return _engine
+
+
+async def fetch_all(stmt):
+    async with get_engine().connect() as conn:
+        return (await conn.execute(stmt)).all()
+
+
+async def list_collection(model):
+    stream = wants_stream()
+    try:
+        params = parse_list_params(model, request.args, stream=stream)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    async with get_engine().connect() as conn:
+        stmt = collection_version_query(model)
+        row = (await conn.execute(stmt)).one() if stmt is not None else None
+        version, last_modified = collection_version_parts(model, row)
+        etag = etag_for(version, stream)
+        if not_modified(etag, last_modified):
+            return not_modified_response(etag, last_modified)
+
+        if stream:
+            response = Response(mimetype='application/x-ndjson')
+            response.async_body = stream_collection(model, params)
+            return with_validators(response, etag, last_modified)
+
+        async def load_page():
+            rows = (await conn.execute(build_list_query(model, params))).all()
+            items, next_cursor = rows_to_page(model, params, rows)
+            return dumps(items), next_cursor
+
+        body, next_cursor = await cache.get_or_load_async(list_cache_key(model, version), load_page)
+    return page_response(body, next_cursor, etag, last_modified), 200
+
+
+async def stream_collection(model, params):
+    # Runs after the view has returned, on its own server-side cursor
+    stmt = build_list_query(model, params, probe_next=False)
+    serializer = serializer_for(model, params['columns'])
+    async with get_engine().connect() as conn:
+        result = await conn.stream(stmt)
+        async for rows in result.partitions(app.config['STREAM_BATCH_SIZE']):
+            yield serializer.ndjson(rows)
+
+
+async def get_pet_popularity(pet_id):
+    async def load_score():
+        rows = await fetch_all(pet_popularity_query(pet_id))
+        return popularity_from_row(pet_id, rows[0] if rows else None)
+
+    try:
+        score, last_updated = await cache.get_or_load_async(cache.entity_key('popularity', pet_id), load_score)
+        return popularity_response(score, last_updated)
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+async def get_all_popularity_scores():
+    async def load_scores():
+        rows = await fetch_all(materialized_popularity_query())
+        return {pet_id: int(score) for pet_id, score in rows}
+
+    try:
+        async with get_engine().connect() as conn:
+            version = ranking_version_parts((await conn.execute(ranking_version_query())).one())
+        etag = etag_for(version)
+        if not_modified(etag):
+            return not_modified_response(etag)
+        scores = await cache.get_or_load_async(popularity_scores_key(version), load_scores)
+        return with_validators(json_response(scores), etag)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+async def get_multiple_attempts():
+    try:
+        rows = await fetch_all(multiple_attempts_query(wants_archived()))
+        return jsonify([dict(row._mapping) for row in rows]), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+async def check_volunteer_schedule():
+    try:
+        volunteer_id, shift_date = parse_schedule_check(request.args)
+    except ValidationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        rows = await fetch_all(schedule_check_query(volunteer_id, shift_date))
+        return json_response(serializer_for(VolunteerSchedule).rows(rows))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def list_view(model):
+    async def view():
+        return await list_collection(model)
+    return view
+
+
+# Flask endpoint -> coroutine serving its GETs; the URL rules stay in app.py
+ASYNC_VIEWS = {
+    'handle_pets': list_view(Pet),
+    'handle_adopters': list_view(Adopter),
+    'handle_adoption_applications': list_view(AdoptionApplication),
+    'handle_volunteers': list_view(Volunteer),
+    'handle_volunteer_schedules': list_view(VolunteerSchedule),
+    'get_pet_popularity': get_pet_popularity,
+    'get_all_popularity_scores': get_all_popularity_scores,
+    'get_multiple_attempts': get_multiple_attempts,
+    'check_volunteer_schedule': check_volunteer_schedule
+}
+
+
+def wsgi_environ(scope, body):
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin-1'),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        # The body is already read in full, so it can be read to EOF
+        'wsgi.input_terminated': True,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False
+    }
+    for name, value in scope['headers']:
+        name, value = name.decode('latin-1').upper().replace('-', '_'), value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = 'HTTP_' + name
+        environ[name] = f'{environ[name]},{value}' if name in environ else value
+    return environ
+
+
+def call_wsgi(environ):
+    # Buffers the whole body; the streaming routes are served natively
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'], started['headers'] = int(status.split(' ', 1)[0]), headers
+        return chunks.append
+
+    chunks = []
+    result = app(environ, start_response)
+    try:
+        chunks.extend(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return started['status'], started['headers'], b''.join(chunks)
+
+
+async def read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return body
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+async def send_response(send, status, headers, body=b'', chunks=None):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    })
+    if chunks is not None:
+        async for chunk in chunks:
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def dispatch(view):
+    # Flask's full_dispatch_request, awaiting the view
+    try:
+        try:
+            rv = app.preprocess_request()
+            if rv is None:
+                rv = await view(**request.view_args)
+        except Exception as e:
+            rv = app.handle_user_exception(e)
+        return app.finalize_request(rv)
+    except Exception as e:
+        return app.handle_exception(e)
+
+
+class AsyncApp:
+    def __init__(self):
+        self.bridge = ThreadPoolExecutor(max_workers=BRIDGE_THREADS, thread_name_prefix='flask-bridge')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            return
+
+        environ = wsgi_environ(scope, await read_body(receive))
+        ctx = app.request_context(environ)
+        ctx.push()
+        try:
+            view = ASYNC_VIEWS.get(request.endpoint) if request.method == 'GET' else None
+            if view is not None and not wants_async():
+                response = await dispatch(view)
+            else:
+                response = None
+        finally:
+            ctx.pop()
+
+        if response is None:
+            # Not served here: run the Flask app itself on a bridge thread
+            loop = asyncio.get_running_loop()
+            status, headers, body = await loop.run_in_executor(self.bridge, call_wsgi, environ)
+            return await send_response(send, status, headers, body)
+        await send_response(send, response.status_code, response.headers.to_wsgi_list(),
+                            response.get_data(), getattr(response, 'async_body', None))
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    get_engine()
+                    with app.app_context():
+                        ensure_replicator_started()
+                except Exception as e:
+                    logger.error(f"Async engine startup error: {str(e)}")
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if _engine is not None:
+                    await _engine.dispose()
+                if app.config['REPLICATION_ENABLED']:
+                    get_replicator().stop(timeout=5)
+                self.bridge.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+application = AsyncApp()
@@ -0,0 +1,62 @@
+"""Benchmark archival of adoption history and the reports that read it.
+
+    python backend/benchmarks/bench_archive.py --records 1000000 --horizon-days 1095
+
+This seeds --records adoption records spread over ten years, as in
+bench_multiple_attempts.py, and times the multiple-attempts report. Then it
+archives everything older than --horizon-days in batches of --batch-size,
+reporting rows per second and the longest batch, which bounds how long
+locks are held. Finally it times the report over the hot tier alone and
+over both tiers with include_archived, and checks that the latter matches
+the report taken before archiving.
+"""
+import argparse
+
+from common import load_app, report, timed
+from bench_multiple_attempts import seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--records', type=int, default=200000)
+    parser.add_argument('--pets', type=int, default=10000)
+    parser.add_argument('--horizon-days', type=int, default=1095)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    happy_tails = load_app(args.database_url)
+    with happy_tails.app.app_context():
+        db = happy_tails.db
+        seed(happy_tails, args.records, args.pets, args.seed)
+
+        def attempts(include_archived=False):
+            return [tuple(row) for row in db.session.execute(happy_tails.multiple_attempts_query(include_archived))]
+
+        before, before_seconds = timed(attempts)
+        db.session.remove()
+        archived, archive_seconds = timed(happy_tails.archive_history, args.horizon_days, args.batch_size)
+        hot, hot_seconds = timed(attempts)
+        combined, combined_seconds = timed(attempts, True)
+
+    moved = archived['tables']['adoption_record']
+    report({
+        'records': args.records,
+        'cutoff': archived['cutoff'],
+        'rows_archived': moved['rows_archived'],
+        'archive_seconds': round(archive_seconds, 2),
+        'archive_rows_per_second': round(moved['rows_archived'] / archive_seconds, 1) if archive_seconds else None,
+        'longest_batch_ms': moved['longest_batch_ms'],
+        'multiple_attempts_ms': {
+            'before_archiving': round(before_seconds * 1000, 2),
+            'hot_only': round(hot_seconds * 1000, 2),
+            'include_archived': round(combined_seconds * 1000, 2)
+        },
+        'hot_only_pets': len(hot),
+        'include_archived_matches_before': combined == before
+    })
+
+
+if __name__ == '__main__':
+    main()
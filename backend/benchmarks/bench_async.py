@@ -0,0 +1,192 @@
+"""Compare the threaded Flask server with the asyncio serving path.
+
+    pip install sqlalchemy[asyncio] aiosqlite aiomysql
+    python backend/benchmarks/bench_async.py --rows 100000 --threads 16 --concurrency 16,64,256
+    python backend/benchmarks/bench_async.py --database-url mysql+pymysql://... --skip-seed
+
+Both servers run in this process. The threaded one is the Flask app on a pool
+of --threads workers, as a threaded WSGI server would run it. The async one is
+async_app.application, called directly over ASGI. At each --concurrency level
+that many clients send the read scenarios back to back, so requests beyond
+the thread count queue for a worker.
+
+Before timing, every scenario is sent to both servers once. Status, body,
+ETag, Link and Content-Type must match, and the result is reported as
+"responses_match". The cache is bypassed unless --cache is passed, so every
+request reaches the database.
+
+For each server the report gives throughput and p50/p99 latency per level,
+and the highest level whose p99 stays within --p99-ms. Local SQLite answers
+before the event loop has anything to overlap, so run against MySQL to see
+the concurrency gain.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import load_app, report
+from datagen import generate
+from loadtest import percentile
+
+COMPARED_HEADERS = ('Content-Type', 'ETag', 'Link', 'X-Next-Cursor')
+
+
+def build_paths(rng, pets, volunteers):
+    day = '2024-06-01'
+    return {
+        'list_pets': lambda: '/pets',
+        'list_pets_filtered': lambda: '/pets?status=Available&limit=50',
+        'list_pets_page': lambda: f'/pets?cursor={rng.randint(1, pets)}&limit=100',
+        'list_applications': lambda: '/adoption-applications?status=Pending',
+        'list_schedules': lambda: '/volunteer-schedules',
+        'pet_popularity': lambda: f'/pets/{rng.randint(1, pets)}/popularity',
+        'popularity_scores': lambda: '/pets/popularity-scores',
+        'multiple_attempts': lambda: '/pets/multiple-attempts',
+        'check_schedule': lambda: f'/volunteer-schedules/check?volunteer_id={rng.randint(1, volunteers)}'
+                                  f'&shift_date={day}'
+    }
+
+
+async def asgi_get(application, path):
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '', 'headers': [(b'host', b'localhost')],
+        'server': ('localhost', 80), 'client': ('127.0.0.1', 0)
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in messages[0]['headers']}
+    return messages[0]['status'], headers, b''.join(message.get('body', b'') for message in messages[1:])
+
+
+class ThreadedServer:
+    def __init__(self, app, threads):
+        self.app = app
+        self.pool = ThreadPoolExecutor(max_workers=threads)
+
+    def _get(self, path):
+        response = self.app.test_client().get(path, base_url='http://localhost')
+        headers = {name.lower(): value for name, value in response.headers.items()}
+        return response.status_code, headers, response.get_data()
+
+    async def get(self, path):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, self._get, path)
+
+
+class AsyncServer:
+    def __init__(self, application):
+        self.application = application
+
+    async def get(self, path):
+        return await asgi_get(self.application, path)
+
+
+async def check_responses(threaded, served, paths):
+    mismatched = []
+    for name, path in paths.items():
+        path = path()
+        expected, actual = await threaded.get(path), await served.get(path)
+        same = expected[0] == actual[0] and expected[2] == actual[2] and all(
+            expected[1].get(header.lower()) == actual[1].get(header.lower()) for header in COMPARED_HEADERS)
+        if not same:
+            mismatched.append(name)
+    return mismatched
+
+
+async def run_level(server, paths, concurrency, requests):
+    latencies, errors = [], 0
+    queue = [path() for _ in range(requests) for path in paths.values()]
+    random.Random(requests).shuffle(queue)
+    position = 0
+
+    async def client():
+        nonlocal position, errors
+        while position < len(queue):
+            path = queue[position]
+            position += 1
+            start = time.perf_counter()
+            status, _, _ = await server.get(path)
+            latencies.append(time.perf_counter() - start)
+            errors += status >= 500
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    seconds = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / seconds, 1) if seconds else None,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3)
+    }
+
+
+async def benchmark(threaded, served, paths, levels, requests, p99_ms):
+    results = {'responses_mismatched': await check_responses(threaded, served, paths)}
+    results['responses_match'] = not results['responses_mismatched']
+    for label, server in (('threaded', threaded), ('async', served)):
+        runs = {}
+        for concurrency in levels:
+            runs[concurrency] = await run_level(server, paths, concurrency, requests)
+        within = [level for level, run in runs.items() if run['p99_ms'] <= p99_ms]
+        results[label] = {'levels': runs, 'max_concurrency_within_p99': max(within, default=None)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--rows', type=int, default=20000, help='Rows to generate before the run')
+    parser.add_argument('--skip-seed', action='store_true')
+    parser.add_argument('--threads', type=int, default=16, help='Worker threads of the threaded server')
+    parser.add_argument('--concurrency', default='8,32,128', help='Comma-separated client counts')
+    parser.add_argument('--requests', type=int, default=50, help='Requests per scenario per level')
+    parser.add_argument('--p99-ms', type=float, default=100.0, help='p99 budget for max_concurrency_within_p99')
+    parser.add_argument('--cache', action='store_true', help='Leave the read-through cache on')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    if not args.cache:
+        # Entries expire as soon as they are stored
+        os.environ['CACHE_TTL'] = '0'
+    happy_tails = load_app(args.database_url)
+    # Imported after load_app has set DATABASE_URL and sys.path
+    import async_app
+
+    with happy_tails.app.app_context():
+        if not args.skip_seed:
+            generate(happy_tails, args.rows, args.seed)
+        db = happy_tails.db
+        pets = db.session.query(db.func.max(happy_tails.Pet.pet_id)).scalar() or 1
+        volunteers = db.session.query(db.func.max(happy_tails.Volunteer.volunteer_id)).scalar() or 1
+        dialect = db.engine.dialect.name
+
+    levels = [int(level) for level in args.concurrency.split(',')]
+    paths = build_paths(random.Random(args.seed), pets, volunteers)
+    results = asyncio.run(benchmark(ThreadedServer(happy_tails.app, args.threads),
+                                    AsyncServer(async_app.application), paths, levels, args.requests, args.p99_ms))
+    results['run'] = {
+        'dialect': dialect,
+        'async_url': async_app.get_engine().url.render_as_string(hide_password=True),
+        'threads': args.threads,
+        'cache': args.cache,
+        'p99_budget_ms': args.p99_ms
+    }
+    report(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark volunteer auto-assignment over a year of shifts.
+
+    python backend/benchmarks/bench_auto_assign.py --volunteers 5000 --days 365
+
+This seeds --volunteers volunteers with datagen's skill and availability mix,
+then times POST /volunteer-schedules/auto-assign end to end, both as a dry
+run and committed. Every datagen skill is required --per-day times a day.
+It also checks that no volunteer got two shifts on one day and that each
+committed shift is within the volunteer's availability.
+"""
+import argparse
+import datetime
+import random
+import time
+from collections import Counter
+
+from sqlalchemy import insert, select
+
+from common import load_app, report
+from datagen import SKILLS, generate_volunteers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--volunteers', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--per-day', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    happy_tails = load_app(args.database_url)
+    db = happy_tails.db
+    start = datetime.date(2030, 1, 1)
+    body = {
+        'start_date': start.isoformat(),
+        'end_date': (start + datetime.timedelta(days=args.days - 1)).isoformat(),
+        'requirements': [{'skill': skill, 'per_day': args.per_day} for skill in SKILLS]
+    }
+
+    with happy_tails.app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.execute(insert(happy_tails.Volunteer.__table__),
+                           list(generate_volunteers(random.Random(args.seed), args.volunteers)))
+        db.session.commit()
+
+    client = happy_tails.app.test_client()
+    results = {'volunteers': args.volunteers, 'days': args.days,
+               'slots': args.days * len(SKILLS) * args.per_day}
+    for label, dry_run in (('dry_run', True), ('commit', False)):
+        started = time.perf_counter()
+        response = client.post('/volunteer-schedules/auto-assign', json={**body, 'dry_run': dry_run})
+        seconds = time.perf_counter() - started
+        summary = response.get_json()
+        results[label] = {
+            'status': response.status_code,
+            'seconds': round(seconds, 3),
+            'planned': summary.get('planned'),
+            'scheduled': summary.get('scheduled'),
+            'unfilled_slots': sum(entry['missing'] for entry in summary.get('unfilled', []))
+        }
+
+    with happy_tails.app.app_context():
+        schedule = happy_tails.VolunteerSchedule.__table__
+        volunteer = happy_tails.Volunteer.__table__
+        availability = dict(db.session.execute(select(volunteer.c.volunteer_id, volunteer.c.availability)).all())
+        shifts = db.session.execute(select(schedule.c.volunteer_id, schedule.c.shift_date)).all()
+        per_volunteer = Counter(volunteer_id for volunteer_id, _ in shifts)
+    allowed = {'Weekdays': range(0, 5), 'Weekends': range(5, 7), 'Flexible': range(0, 7)}
+    results['checks'] = {
+        'one_shift_per_day': len(shifts) == len(set(shifts)),
+        'within_availability': all(day.weekday() in allowed[availability[volunteer_id]]
+                                   for volunteer_id, day in shifts)
+    }
+    results['shifts_per_volunteer'] = {
+        'min': min(per_volunteer.values(), default=0),
+        'max': max(per_volunteer.values(), default=0),
+        'volunteers_used': len(per_volunteer)
+    }
+    report(results)
+
+
+if __name__ == '__main__':
+    main()
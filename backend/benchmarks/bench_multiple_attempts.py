@@ -0,0 +1,106 @@
+"""Benchmark the multiple-attempts report against the old recursive CTE.
+
+    python backend/benchmarks/bench_multiple_attempts.py --records 1000000
+
+The recursive CTE enumerates every chain of later adoptions per pet, which
+blows up on heavily re-adopted pets, so it only runs while the record count
+is at or below --legacy-max-records. That run uses a flat fan-out (the CTE
+is exponential in records per pet) and checks both implementations return
+identical results.
+"""
+import argparse
+import datetime
+import random
+
+from sqlalchemy import insert, text
+
+from common import load_app, report, timed
+
+LEGACY_QUERY = text("""
+    WITH RECURSIVE AdoptionAttempts AS (
+        SELECT pet_id, adoption_date, 1 as attempt_count
+        FROM adoption_record
+        UNION ALL
+        SELECT ar.pet_id, ar.adoption_date, aa.attempt_count + 1
+        FROM adoption_record ar
+        JOIN AdoptionAttempts aa ON ar.pet_id = aa.pet_id
+        WHERE ar.adoption_date > aa.adoption_date
+    )
+    SELECT pet_id, MAX(adoption_date) as adoption_date, MAX(attempt_count) as attempt_count
+    FROM AdoptionAttempts
+    GROUP BY pet_id
+    HAVING MAX(attempt_count) > 1
+""")
+
+
+def seed(happy_tails, records, pets, seed_value, skewed=True, chunk_size=50000):
+    rng = random.Random(seed_value)
+    db = happy_tails.db
+    db.drop_all()
+    db.create_all()
+    db.session.execute(insert(happy_tails.Adopter.__table__), [
+        {'full_name': 'Bench Adopter', 'contact_info': 'bench@email.com'}
+    ])
+    db.session.execute(insert(happy_tails.Pet.__table__), [
+        {'name': f'Pet {i}', 'age': 1, 'weight': 10, 'health_condition': 'Good', 'status': 'Available'}
+        for i in range(pets)
+    ])
+    # Skewed fan-out: a few pets are returned and re-adopted many times
+    weights = [1.0 / (rank + 1) if skewed else 1.0 for rank in range(pets)]
+    start = datetime.date(2015, 1, 1)
+    pending = []
+    for pet_id in rng.choices(range(1, pets + 1), weights=weights, k=records):
+        pending.append({
+            'pet_id': pet_id,
+            'adopter_id': 1,
+            'adoption_date': start + datetime.timedelta(days=rng.randint(0, 3650))
+        })
+        if len(pending) >= chunk_size:
+            db.session.execute(insert(happy_tails.AdoptionRecord.__table__), pending)
+            pending = []
+    if pending:
+        db.session.execute(insert(happy_tails.AdoptionRecord.__table__), pending)
+    db.session.commit()
+
+
+def run_report(happy_tails, query):
+    rows = happy_tails.db.session.execute(query).all()
+    return sorted((row.pet_id, str(row.adoption_date), row.attempt_count) for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--database-url')
+    parser.add_argument('--records', type=int, default=1000000)
+    parser.add_argument('--pets', type=int, default=100000)
+    parser.add_argument('--legacy-max-records', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    happy_tails = load_app(args.database_url)
+    results = []
+    with happy_tails.app.app_context():
+        sizes = sorted({min(args.records, args.legacy_max_records), args.records})
+        for records in sizes:
+            run_legacy = records <= args.legacy_max_records
+            pets = min(args.pets, max(records // (4 if run_legacy else 10), 1))
+            _, seed_seconds = timed(seed, happy_tails, records, pets, args.seed, skewed=not run_legacy)
+            current, seconds = timed(run_report, happy_tails, happy_tails.multiple_attempts_query())
+            result = {
+                'records': records,
+                'pets': pets,
+                'fan_out': 'flat' if run_legacy else 'skewed',
+                'seed_seconds': round(seed_seconds, 2),
+                'grouped_seconds': round(seconds, 4),
+                'pets_reported': len(current)
+            }
+            if run_legacy:
+                legacy, legacy_seconds = timed(run_report, happy_tails, LEGACY_QUERY)
+                result['recursive_cte_seconds'] = round(legacy_seconds, 4)
+                result['results_match'] = legacy == current
+            results.append(result)
+    report(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Compare the batched popularity scoring against the old per-pet loop.
+
+    python backend/benchmarks/bench_popularity.py --pets 50000
+
+On SQLite the calculate_popularity_score stored function is registered as a
+Python UDF, the app's own calculate_popularity_score, so the legacy loop runs
+unchanged and always scores with the current formula.
+"""
+import argparse
+import random
+
+from sqlalchemy import event, insert, text
+
+from common import is_sqlite, load_app, report, timed
+
+BREEDS = ['Labrador', 'Beagle', 'German Shepherd', 'Persian Cat', 'Golden Retriever', None]
+APPLICATION_STATUSES = ['Pending', 'Pending', 'Approved', 'Rejected']
+
+
+def seed(happy_tails, pets, max_applications, seed_value):
+    rng = random.Random(seed_value)
+    db = happy_tails.db
+    db.drop_all()
+    db.create_all()
+    db.session.execute(insert(happy_tails.Adopter.__table__), [
+        {'full_name': 'Bench Adopter', 'contact_info': 'bench@email.com'}
+    ])
+    db.session.execute(insert(happy_tails.Pet.__table__), [
+        {
+            'name': f'Pet {i}',
+            'breed': rng.choice(BREEDS),
+            'age': rng.choice([None, 0, 1, 2, 3, 5, 8]),
+            'weight': 10,
+            'health_condition': 'Good',
+            'status': 'Available'
+        }
+        for i in range(pets)
+    ])
+    pet_ids = [row[0] for row in db.session.execute(text('SELECT pet_id FROM pet'))]
+    adopter_id = db.session.execute(text('SELECT adopter_id FROM adopter')).scalar()
+    applications = [
+        {'pet_id': pet_id, 'adopter_id': adopter_id, 'status': rng.choice(APPLICATION_STATUSES)}
+        for pet_id in pet_ids
+        for _ in range(rng.randint(0, max_applications))
+    ]
+    if applications:
+        db.session.execute(insert(happy_tails.AdoptionApplication.__table__), applications)
+    db.session.commit()
+    return len(applications)
+
+
+def per_pet_loop(happy_tails):
+    # The original get_all_popularity_scores implementation
+    db = happy_tails.db
+    scores = {}
+    for pet in happy_tails.Pet.query.all():
+        pending_applications = happy_tails.AdoptionApplication.query.filter_by(
+            pet_id=pet.pet_id,
+            status='Pending'
+        ).count()
+        with db.engine.connect() as conn:
+            result = conn.execute(
+                text("SELECT calculate_popularity_score(:breed, :age, :apps)"),
+                {"breed": pet.breed, "age": pet.age, "apps": pending_applications}
+            )
+            scores[pet.pet_id] = result.scalar()
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--database-url')
+    parser.add_argument('--pets', type=int, default=5000)
+    parser.add_argument('--max-applications', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--skip-legacy', action='store_true')
+    args = parser.parse_args()
+
+    happy_tails = load_app(args.database_url)
+    with happy_tails.app.app_context():
+        engine = happy_tails.db.engine
+        if is_sqlite(engine):
+            event.listen(engine, 'connect', lambda conn, record: conn.create_function(
+                'calculate_popularity_score', 3, happy_tails.calculate_popularity_score))
+            engine.dispose()
+        applications = seed(happy_tails, args.pets, args.max_applications, args.seed)
+
+        batched, batched_seconds = timed(happy_tails.compute_popularity_scores)
+        results = {
+            'pets': args.pets,
+            'applications': applications,
+            'batched_seconds': round(batched_seconds, 4),
+        }
+        if not args.skip_legacy:
+            happy_tails.db.session.expunge_all()
+            legacy, legacy_seconds = timed(per_pet_loop, happy_tails)
+            results['per_pet_seconds'] = round(legacy_seconds, 4)
+            results['speedup'] = round(legacy_seconds / batched_seconds, 1)
+            results['scores_match'] = legacy == batched
+        report(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark /search's inverted index at scale, without a database.
+
+    python backend/benchmarks/bench_search.py --entities 1000000
+
+This indexes --entities pets from datagen with the app's SEARCH_TYPES
+fields, reporting build time and peak RSS. It then runs each query shape
+--repeat times and reports p50/p99 in microseconds per page of --limit ids.
+One query per shape is checked against a brute-force scan of the generated
+rows. Finally it times incremental updates: reindexing a changed pet, and
+appending a batch of new ones.
+"""
+import argparse
+import datetime
+import random
+import resource
+import time
+
+from common import load_app, report
+from datagen import generate_pets
+from loadtest import percentile
+
+QUERIES = {
+    'exact_breed': {'terms': ['beagle']},
+    'prefix': {'terms': ['lab']},
+    'fuzzy': {'terms': ['beagel'], 'fuzzy': True},
+    'name_and_breed': {'terms': ['luna', 'poodle']},
+    'young_available_beagle': {'terms': ['beagle'], 'keywords': {'status': ['Available']}, 'ranges': {'age': (None, 2)}},
+    'keyword_only': {'keywords': {'health_condition': ['Needs Vaccination']}},
+    'wide_range': {'ranges': {'weight': (10, 30)}},
+    'narrow_range': {'ranges': {'weight': (44.9, 45.0)}, 'keywords': {'status': ['Available']}},
+    'one_letter_prefix': {'terms': ['b']},
+    'no_match': {'terms': ['zebra']}
+}
+
+
+def matches(search_index, fields, row, query):
+    words = set()
+    for name, field in fields.items():
+        if field.text and row[name]:
+            words.update(search_index.tokenize(row[name]))
+    for term in query.get('terms', ()):
+        if not any(word.startswith(term) or (query.get('fuzzy') and search_index.within_one_edit(term, word))
+                   for word in words):
+            return False
+    for name, values in query.get('keywords', {}).items():
+        if (row[name] or '').lower() not in {value.lower() for value in values}:
+            return False
+    for name, (low, high) in query.get('ranges', {}).items():
+        value = row[name]
+        if value is None or (low is not None and value < low) or (high is not None and value > high):
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entities', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    happy_tails = load_app()
+    # Imported after load_app has put the backend directory on sys.path
+    import search_index
+
+    _, fields = happy_tails.SEARCH_TYPES['pets']
+    rng = random.Random(args.seed)
+    today = datetime.date.today()
+    rows = [(pet_id, row) for pet_id, row in enumerate(generate_pets(rng, args.entities, today), 1)]
+
+    collection = search_index.Collection(fields)
+    started = time.perf_counter()
+    collection.add_many(rows)
+    results = {
+        'entities': args.entities,
+        'build_seconds': round(time.perf_counter() - started, 2),
+        'terms': len(collection.terms),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'queries': {}
+    }
+
+    for name, query in QUERIES.items():
+        options = {'terms': query.get('terms', ()), 'keywords': query.get('keywords'),
+                   'ranges': query.get('ranges'), 'fuzzy': query.get('fuzzy', False), 'limit': args.limit}
+        ids, _ = collection.search(**options)
+        expected = [pet_id for pet_id, row in rows if matches(search_index, fields, row, query)][:args.limit]
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            collection.search(**options)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        results['queries'][name] = {
+            'results': len(ids),
+            'matches_scan': ids == expected,
+            'p50_us': round(percentile(timings, 0.50) * 1e6, 1),
+            'p99_us': round(percentile(timings, 0.99) * 1e6, 1)
+        }
+
+    changed = dict(rows[len(rows) // 2][1], name='Renamed Pet', breed='Beagle')
+    start = time.perf_counter()
+    collection.add_many([(rows[len(rows) // 2][0], changed)])
+    results['update_one_us'] = round((time.perf_counter() - start) * 1e6, 1)
+    appended = [(args.entities + i + 1, row) for i, row in enumerate(generate_pets(rng, 1000, today))]
+    start = time.perf_counter()
+    collection.add_many(appended)
+    results['append_1000_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    report(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark row-tuple serialization against ORM to_dict + jsonify.
+
+    python backend/benchmarks/bench_serializers.py --rows 200000
+
+For each of the seven list models this loads every row twice: once as ORM
+objects encoded with to_dict and Flask's jsonify, and once as Core row
+tuples encoded by serializers.RowSerializer and serializers.dumps. It checks
+that both produce the same documents and reports the time taken by each.
+"""
+import argparse
+import datetime
+import json
+
+from sqlalchemy import insert, select
+
+from common import load_app, report, timed
+from datagen import generate
+
+
+def seed_audits(happy_tails, count):
+    # datagen leaves the audit table to the schedule triggers, which only
+    # exist on MySQL; fill it directly so every model has rows
+    rows = [{'volunteer_id': 1, 'shift_date': datetime.date(2024, 1, 1) + datetime.timedelta(days=i % 365),
+             'update_timestamp': datetime.datetime(2024, 1, 1, 12, 0, 0, i % 1000000)}
+            for i in range(count)]
+    happy_tails.db.session.execute(insert(happy_tails.VolunteerAudit.__table__), rows)
+    happy_tails.db.session.commit()
+
+
+def orm_path(happy_tails, model):
+    with happy_tails.app.test_request_context():
+        objects = model.query.order_by(*model.__mapper__.primary_key).all()
+        return happy_tails.jsonify([obj.to_dict() for obj in objects]).get_data()
+
+
+def row_path(happy_tails, model):
+    table = model.__table__
+    rows = happy_tails.db.session.execute(select(table).order_by(*table.primary_key.columns)).all()
+    return happy_tails.dumps(happy_tails.serializer_for(model).rows(rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    happy_tails = load_app(args.database_url)
+    models = [happy_tails.Pet, happy_tails.Adopter, happy_tails.AdoptionApplication,
+              happy_tails.AdoptionRecord, happy_tails.Volunteer, happy_tails.VolunteerSchedule,
+              happy_tails.VolunteerAudit]
+    # Imported after load_app has put the backend directory on sys.path
+    import serializers
+    results = {'json_backend': serializers.JSON_BACKEND, 'models': {}}
+    with happy_tails.app.app_context():
+        generate(happy_tails, args.rows, args.seed)
+        seed_audits(happy_tails, max(args.rows // 20, 100))
+        for model in models:
+            happy_tails.db.session.expunge_all()
+            legacy, legacy_seconds = timed(orm_path, happy_tails, model)
+            happy_tails.db.session.expunge_all()
+            current, seconds = timed(row_path, happy_tails, model)
+            legacy_docs = json.loads(legacy)
+            results['models'][model.__tablename__] = {
+                'rows': len(legacy_docs),
+                'to_dict_jsonify_seconds': round(legacy_seconds, 4),
+                'row_serializer_seconds': round(seconds, 4),
+                'speedup': round(legacy_seconds / seconds, 2) if seconds else None,
+                'results_match': legacy_docs == json.loads(current)
+            }
+    report(results)
+
+
+if __name__ == '__main__':
+    main()
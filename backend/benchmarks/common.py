@@ -0,0 +1,47 @@
+"""Shared helpers for the benchmark scripts in this directory.
+
+The benchmarks import the real application module, so DATABASE_URL has to be
+set before ``app`` is imported. Most of them drop and recreate every table,
+so they only touch a database named with --database-url (point it at a
+MySQL server to benchmark against production-like storage). Otherwise they
+use a throwaway SQLite file, whatever DATABASE_URL the environment holds.
+The remote pet_health store is always a throwaway SQLite file, and the
+background replicator is off; /replication/drain still replicates on demand.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_app(database_url=None):
+    directory = tempfile.mkdtemp(prefix='happy_tails_bench_')
+    if not database_url:
+        # Never the environment's DATABASE_URL, which may be a real schema
+        database_url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    os.environ['DATABASE_URL'] = database_url
+    # Nor the remote store: federated health updates land here instead
+    os.environ['REMOTE_DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'remote.db')}"
+    os.environ['REPLICATION_ENABLED'] = 'false'
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    import app as happy_tails
+    happy_tails.remote_metadata.create_all(happy_tails.shared_engine(os.environ['REMOTE_DATABASE_URL']))
+    return happy_tails
+
+
+def is_sqlite(engine):
+    return engine.dialect.name == 'sqlite'
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def report(results):
+    print(json.dumps(results, indent=2, sort_keys=True, default=str))
@@ -0,0 +1,286 @@
+"""Generate a synthetic Happy Tails dataset at a configurable scale.
+
+    python backend/benchmarks/datagen.py --rows 1000000 --seed 7
+
+--rows is the approximate total across all tables (about ROWS_PER_PET rows
+per pet), anywhere from 10^3 to 10^7. The distributions aim to look like a
+real shelter rather than uniform noise:
+
+* breeds follow a long tail, with the popular breeds most common, and cats
+  get cat weights;
+* ages skew young, and health, status and vaccination fields stay within
+  the CHECK constraints and agree with each other;
+* application fan-out per pet is heavy-tailed, and popular young pets draw
+  the most applicants;
+* some adopted pets come back and are re-adopted, giving several adoption
+  records per pet;
+* each volunteer gets a shift calendar that respects their availability,
+  with at most one shift per day.
+
+Rows are generated lazily and written with multi-row Core INSERTs of
+--chunk-size rows, the same path the /bulk endpoints use, so memory stays
+flat at any scale. The target database is dropped and recreated first.
+"""
+import argparse
+import datetime
+import itertools
+import random
+
+from sqlalchemy import insert
+
+from common import load_app, report, timed
+
+# Pets, adopters, applications, adoption records, volunteers and schedules
+# per generated pet, on average
+ROWS_PER_PET = 6.2
+
+DOG_BREEDS = [
+    ('Labrador', 14), ('German Shepherd', 10), ('Beagle', 9), ('Golden Retriever', 8),
+    ('Bulldog', 5), ('Poodle', 5), ('Boxer', 4), ('Dachshund', 4), ('Husky', 3),
+    ('Chihuahua', 3), ('Pit Bull', 6), ('Mixed Breed', 12)
+]
+CAT_BREEDS = [('Domestic Shorthair', 8), ('Persian Cat', 2), ('Siamese', 2), ('Maine Coon', 1)]
+BREEDS = [breed for breed, _ in DOG_BREEDS + CAT_BREEDS] + [None]
+BREED_WEIGHTS = [weight for _, weight in DOG_BREEDS + CAT_BREEDS] + [4]
+CATS = {breed for breed, _ in CAT_BREEDS}
+
+# Shelters take in far more puppies and young adults than seniors
+AGES = list(range(16))
+AGE_WEIGHTS = [18, 16, 13, 11, 9, 7, 6, 5, 4, 3, 2.5, 2, 1.5, 1, 0.6, 0.4]
+
+HEALTH = ['Good', 'Fair', 'Poor', 'Needs Vaccination', 'Underweight']
+HEALTH_WEIGHTS = [60, 20, 5, 10, 5]
+STATUSES = ['Available', 'In Review', 'High Demand', 'Adopted']
+STATUS_WEIGHTS = [65, 10, 10, 15]
+
+APPLICATION_STATUSES = ['Pending', 'Approved', 'Rejected']
+APPLICATION_STATUS_WEIGHTS = [50, 15, 35]
+
+SKILLS = ['Dog Walking', 'Cat Care', 'Grooming', 'Training', 'Medical', 'Cleaning',
+          'Transport', 'Fundraising', 'Photography', 'Events']
+AVAILABILITY = ['Weekdays', 'Weekends', 'Flexible']
+AVAILABILITY_WEIGHTS = [40, 35, 25]
+
+FIRST_NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery',
+               'Quinn', 'Maria', 'Wei', 'Priya', 'Omar', 'Lena', 'Noah', 'Emma', 'Liam', 'Olivia']
+LAST_NAMES = ['Smith', 'Johnson', 'Brown', 'Garcia', 'Miller', 'Davis', 'Lopez', 'Wilson',
+              'Anderson', 'Thomas', 'Patel', 'Kim', 'Nguyen', 'Müller', 'Rossi', 'Silva']
+PET_NAMES = ['Max', 'Luna', 'Rocky', 'Bella', 'Charlie', 'Daisy', 'Milo', 'Coco', 'Buddy',
+             'Lucy', 'Bailey', 'Nala', 'Leo', 'Zoe', 'Oscar', 'Ruby', 'Toby', 'Willow']
+
+HISTORY_DAYS = 730
+SCHEDULE_DAYS = 365
+
+
+def table_counts(rows):
+    pets = max(int(rows / ROWS_PER_PET), 10)
+    return {
+        'pets': pets,
+        'adopters': max(int(pets * 0.6), 10),
+        'volunteers': max(pets // 50, 5)
+    }
+
+
+def person_name(rng):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+
+def generate_pets(rng, count, today):
+    for i in range(count):
+        breed = rng.choices(BREEDS, BREED_WEIGHTS)[0]
+        age = rng.choices(AGES, AGE_WEIGHTS)[0]
+        if breed in CATS:
+            weight = rng.uniform(2.5, 7.5)
+        else:
+            weight = rng.uniform(3.0, 12.0) if age == 0 else rng.uniform(5.0, 45.0)
+        health = rng.choices(HEALTH, HEALTH_WEIGHTS)[0]
+        # Mirrors the health trigger: sick pets are never up for adoption
+        if health in ('Poor', 'Underweight'):
+            status = 'Not Available'
+        else:
+            status = rng.choices(STATUSES, STATUS_WEIGHTS)[0]
+        vaccinated = health != 'Needs Vaccination' and rng.random() < 0.8
+        yield {
+            'name': f'{rng.choice(PET_NAMES)} {i + 1}',
+            'breed': breed,
+            'age': age,
+            'weight': round(weight, 2),
+            'health_condition': health,
+            'vaccination_status': 'Vaccinated' if vaccinated else 'Not Vaccinated',
+            'vaccination_due_date': today + datetime.timedelta(days=rng.randint(-60, 365)),
+            'status': status,
+            'last_updated': datetime.datetime.combine(
+                today - datetime.timedelta(days=rng.randint(0, HISTORY_DAYS)), datetime.time(12)),
+            # Filled in for real by refresh_pet_popularity once applications exist
+            'pending_application_count': 0
+        }
+
+
+def generate_adopters(rng, count):
+    for i in range(count):
+        name = person_name(rng)
+        yield {
+            'full_name': name,
+            'contact_info': f"{name.split()[0].lower()}.{i + 1}@example.com"
+        }
+
+
+def application_fan_out(rng, breed, age):
+    # Pareto-distributed interest, boosted for popular breeds and young pets
+    interest = rng.paretovariate(1.4) - 1
+    if breed in ('Labrador', 'Beagle', 'German Shepherd'):
+        interest *= 2.5
+    if age < 3:
+        interest *= 1.5
+    return min(int(interest), 200)
+
+
+def generate_pet_activity(rng, pets, adopter_count, today):
+    """Yield ('application' | 'record', row) pairs for every pet in turn."""
+    for pet_id, (breed, age) in enumerate(pets, start=1):
+        for _ in range(application_fan_out(rng, breed, age)):
+            yield 'application', {
+                'pet_id': pet_id,
+                'adopter_id': rng.randint(1, adopter_count),
+                'status': rng.choices(APPLICATION_STATUSES, APPLICATION_STATUS_WEIGHTS)[0],
+                'application_date': today - datetime.timedelta(days=rng.randint(0, HISTORY_DAYS))
+            }
+        # A third of pets have been adopted at least once; some were
+        # returned and re-adopted later
+        if rng.random() < 0.35:
+            day = rng.randint(0, HISTORY_DAYS)
+            while day >= 0:
+                yield 'record', {
+                    'pet_id': pet_id,
+                    'adopter_id': rng.randint(1, adopter_count),
+                    'adoption_date': today - datetime.timedelta(days=day)
+                }
+                if rng.random() >= 0.15:
+                    break
+                day -= rng.randint(14, 180)
+
+
+def generate_volunteers(rng, count):
+    for _ in range(count):
+        name = person_name(rng)
+        yield {
+            'full_name': name,
+            'contact_info': f"{name.replace(' ', '.').lower()}@example.com",
+            'skills': ', '.join(rng.sample(SKILLS, rng.randint(1, 3))),
+            'availability': rng.choices(AVAILABILITY, AVAILABILITY_WEIGHTS)[0],
+            'last_assigned_date': None
+        }
+
+
+def generate_schedules(rng, volunteers, today):
+    tasks = ['Morning feeding', 'Kennel cleaning', 'Dog walking', 'Adoption event',
+             'Vet transport', 'Front desk', 'Cat room socialising']
+    for volunteer_id, volunteer in enumerate(volunteers, start=1):
+        days = [today + datetime.timedelta(days=offset) for offset in range(-SCHEDULE_DAYS // 2, SCHEDULE_DAYS // 2)]
+        if volunteer['availability'] == 'Weekdays':
+            days = [day for day in days if day.weekday() < 5]
+        elif volunteer['availability'] == 'Weekends':
+            days = [day for day in days if day.weekday() >= 5]
+        # Roughly a shift a week, with a few very active volunteers
+        shifts = min(len(days), int(rng.expovariate(1 / 40)))
+        for shift_date in sorted(rng.sample(days, shifts)):
+            yield {
+                'volunteer_id': volunteer_id,
+                'shift_date': shift_date,
+                'task_description': rng.choice(tasks)
+            }
+
+
+def write(db, table, rows, chunk_size):
+    written = 0
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return written
+        db.session.execute(insert(table), chunk)
+        written += len(chunk)
+
+
+def generate(happy_tails, rows, seed=1, chunk_size=5000):
+    """Drop and recreate the schema, then fill it with about ``rows`` rows.
+
+    Returns the number of rows written per table.
+    """
+    rng = random.Random(seed)
+    db = happy_tails.db
+    today = datetime.date.today()
+    counts = table_counts(rows)
+
+    db.drop_all()
+    db.create_all()
+
+    # Fan-out depends on breed and age, so only those are kept per pet
+    pet_traits = []
+
+    def scored_pets():
+        for pet in generate_pets(rng, counts['pets'], today):
+            pet['popularity_score'] = happy_tails.calculate_popularity_score(pet['breed'], pet['age'], 0)
+            pet_traits.append((pet['breed'], pet['age']))
+            yield pet
+
+    written = {
+        'pet': write(db, happy_tails.Pet.__table__, scored_pets(), chunk_size),
+        'adopter': write(db, happy_tails.Adopter.__table__,
+                         generate_adopters(rng, counts['adopters']), chunk_size),
+        'adoption_application': 0,
+        'adoption_record': 0
+    }
+
+    tables = {
+        'application': happy_tails.AdoptionApplication.__table__,
+        'record': happy_tails.AdoptionRecord.__table__
+    }
+    buffers = {'application': [], 'record': []}
+    for kind, row in generate_pet_activity(rng, pet_traits, counts['adopters'], today):
+        buffers[kind].append(row)
+        if len(buffers[kind]) >= chunk_size:
+            db.session.execute(insert(tables[kind]), buffers[kind])
+            written['adoption_' + kind] += len(buffers[kind])
+            buffers[kind] = []
+    for kind, buffer in buffers.items():
+        if buffer:
+            db.session.execute(insert(tables[kind]), buffer)
+            written['adoption_' + kind] += len(buffer)
+    pet_traits.clear()
+
+    volunteers = list(generate_volunteers(rng, counts['volunteers']))
+    written['volunteer'] = write(db, happy_tails.Volunteer.__table__, volunteers, chunk_size)
+    written['volunteer_schedule'] = write(db, happy_tails.VolunteerSchedule.__table__,
+                                          generate_schedules(rng, volunteers, today), chunk_size)
+
+    # Same maintenance the bulk application endpoint does per chunk
+    happy_tails.refresh_pet_popularity(db.session.connection())
+    db.session.commit()
+    happy_tails.cache.clear()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    happy_tails = load_app(args.database_url)
+    with happy_tails.app.app_context():
+        written, seconds = timed(generate, happy_tails, args.rows, args.seed, args.chunk_size)
+    total = sum(written.values())
+    report({
+        'rows_requested': args.rows,
+        'rows_written': total,
+        'tables': written,
+        'seconds': round(seconds, 2),
+        'rows_per_second': round(total / seconds) if seconds else None
+    })
+
+
+if __name__ == '__main__':
+    main()
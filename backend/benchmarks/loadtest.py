@@ -0,0 +1,345 @@
+"""Drive every route of the app under concurrency and report latency as JSON.
+
+    python backend/benchmarks/loadtest.py --rows 100000 --requests 200 --concurrency 8
+    python backend/benchmarks/loadtest.py --base-url http://localhost:5000 --skip-seed
+    python backend/benchmarks/loadtest.py --output run.json --baseline previous.json
+
+By default requests go through the Flask test client in this process. With
+--base-url they go over HTTP to a running server instead. Unless --skip-seed
+is passed, the database is first filled by datagen.generate with --rows rows.
+
+Each scenario sends --requests requests, spread over --concurrency threads.
+The report gives, per scenario and overall:
+* throughput
+* p50, p95 and p99 latency in milliseconds
+* error counts
+* SQL statements per request, read from the X-Query-Count header that the
+  request instrumentation adds
+
+With --baseline, each scenario's p95 and query count are compared against an
+earlier report. Scenarios whose p95 grew by more than --tolerance are listed
+under "regressions".
+"""
+import argparse
+import datetime
+import json
+import platform
+import random
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from common import load_app, report
+from datagen import LAST_NAMES, PET_NAMES, generate
+
+
+class TestClientTransport:
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path, body=None):
+        # One client per thread; the test client keeps per-client state
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, json=body)
+        return response.status_code, response.headers.get('X-Query-Count'), response.get_data()
+
+
+class HttpTransport:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                     headers={'Content-Type': 'application/json'} if data else {})
+        try:
+            with urllib.request.urlopen(req, timeout=60) as response:
+                return response.status, response.headers.get('X-Query-Count'), response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get('X-Query-Count'), e.read()
+
+
+def id_range(transport, path, key):
+    # Highest id currently present, read through the NDJSON export so the
+    # same scenarios work against a remote server
+    status, _, body = transport.request('GET', f'{path}?fields={key}&stream=1')
+    highest = 1
+    if status == 200:
+        for line in body.splitlines():
+            if line.strip():
+                highest = max(highest, json.loads(line)[key])
+    return highest
+
+
+def build_scenarios(transport, rng, requests):
+    pets = id_range(transport, '/pets', 'pet_id')
+    adopters = id_range(transport, '/adopters', 'adopter_id')
+    volunteers = id_range(transport, '/volunteers', 'volunteer_id')
+    applications = id_range(transport, '/adoption-applications', 'application_id')
+    health = ['Good', 'Fair', 'Needs Vaccination']
+    day = datetime.date.today()
+
+    def pet():
+        return rng.randint(1, pets)
+
+    def new_pet(i):
+        return {'name': f'Load {i}', 'breed': rng.choice(['Labrador', 'Beagle', 'Mixed Breed']),
+                'age': rng.randint(0, 12), 'weight': round(rng.uniform(3, 40), 1),
+                'health_condition': 'Good', 'status': 'Available'}
+
+    def application(i):
+        return {'pet_id': pet(), 'adopter_id': rng.randint(1, adopters), 'status': 'Pending',
+                'application_date': day.isoformat()}
+
+    def decisions(i):
+        # Overlapping batches, so some requests find their applications already decided
+        batch = rng.sample(range(1, applications + 1), min(10, applications))
+        return {'approve': batch[:3], 'reject': batch[3:]}
+
+    def volunteer(i):
+        return {'full_name': f'Load Volunteer {i}', 'contact_info': f'load{i}@example.com',
+                'skills': 'Dog Walking', 'availability': 'Flexible'}
+
+    def shift(i):
+        return {'volunteer_id': rng.randint(1, volunteers),
+                'shift_date': (day + datetime.timedelta(days=rng.randint(400, 4000))).isoformat(),
+                'task_description': 'Load test shift'}
+
+    def auto_assign(i):
+        # A week per request, past the dates shift() books
+        start = day + datetime.timedelta(days=5000 + 7 * i)
+        return {'start_date': start.isoformat(), 'end_date': (start + datetime.timedelta(days=6)).isoformat(),
+                'skills': ['Dog Walking', 'Cleaning']}
+
+    # Pets and adopters for the DELETE scenarios, created before timing starts
+    def create(path, body, key):
+        _, _, response = transport.request('POST', path, body)
+        return json.loads(response)[key]
+
+    doomed_pets = [create('/pets', new_pet(i), 'pet_id') for i in range(requests)]
+    doomed_adopters = [create('/adopters', {'full_name': f'Doomed {i}', 'contact_info': f'doomed{i}@example.com'},
+                              'adopter_id') for i in range(requests)]
+    _, _, body = transport.request('POST', '/jobs', {'type': 'popularity_scores'})
+    job_id = json.loads(body).get('job_id', 1)
+    _, _, body = transport.request('POST', '/pets/vaccination-sweeps', {})
+    sweep_id = json.loads(body).get('sweep_id', 1)
+    # Move the older half of the generated history to the archive tier
+    transport.request('POST', '/archive', {'horizon_days': 365})
+
+    # name -> (method, path builder, body builder or None)
+    return {
+        'list_pets': ('GET', lambda i: '/pets', None),
+        'list_pets_filtered': ('GET', lambda i: '/pets?status=Available&limit=50', None),
+        'list_pets_page': ('GET', lambda i: f'/pets?cursor={pet()}&limit=100', None),
+        'stream_pets': ('GET', lambda i: '/pets?stream=1&limit=5000', None),
+        'create_pet': ('POST', lambda i: '/pets', new_pet),
+        'list_adopters': ('GET', lambda i: '/adopters', None),
+        'create_adopter': ('POST', lambda i: '/adopters',
+                           lambda i: {'full_name': f'Load Adopter {i}', 'contact_info': f'adopter{i}@example.com'}),
+        'list_applications': ('GET', lambda i: '/adoption-applications?status=Pending', None),
+        'create_application': ('POST', lambda i: '/adoption-applications', application),
+        'decide_applications': ('POST', lambda i: '/adoption-applications/decisions', decisions),
+        'list_volunteers': ('GET', lambda i: '/volunteers', None),
+        'create_volunteer': ('POST', lambda i: '/volunteers', volunteer),
+        'bulk_pets': ('POST', lambda i: '/pets/bulk', lambda i: [new_pet(i) for _ in range(100)]),
+        'bulk_adopters': ('POST', lambda i: '/adopters/bulk', lambda i: [
+            {'full_name': f'Bulk {i}', 'contact_info': f'bulk{i}@example.com'} for _ in range(100)]),
+        'bulk_applications': ('POST', lambda i: '/adoption-applications/bulk',
+                              lambda i: [application(i) for _ in range(100)]),
+        'bulk_volunteers': ('POST', lambda i: '/volunteers/bulk', lambda i: [volunteer(i) for _ in range(100)]),
+        'update_health': ('PUT', lambda i: f'/pets/{pet()}/update-health',
+                          lambda i: {'health_condition': rng.choice(health)}),
+        'update_health_federated': ('PUT', lambda i: f'/pets/{pet()}/update-health-federated',
+                                    lambda i: {'health_condition': rng.choice(health)}),
+        'update_vaccinations': ('POST', lambda i: '/pets/update-vaccinations', None),
+        'start_vaccination_sweep': ('POST', lambda i: '/pets/vaccination-sweeps?async=1', lambda i: {}),
+        'get_vaccination_sweep': ('GET', lambda i: f'/pets/vaccination-sweeps/{sweep_id}', None),
+        'resume_vaccination_sweep': ('POST', lambda i: f'/pets/vaccination-sweeps/{sweep_id}/resume', None),
+        'pet_popularity': ('GET', lambda i: f'/pets/{pet()}/popularity', None),
+        'popular_pets': ('GET', lambda i: '/pets/popular?limit=20', None),
+        'ranked_popularity': ('GET', lambda i: '/pets/ranked?key=popularity&limit=20', None),
+        'ranked_vaccination_due': ('GET', lambda i: '/pets/ranked?key=vaccination_due_date&limit=20', None),
+        'ranked_live_popularity': ('GET', lambda i: '/pets/ranked?key=live_popularity&limit=20', None),
+        'popularity_scores': ('GET', lambda i: '/pets/popularity-scores', None),
+        'multiple_attempts': ('GET', lambda i: '/pets/multiple-attempts', None),
+        'multiple_attempts_archived': ('GET', lambda i: '/pets/multiple-attempts?include_archived=true', None),
+        'list_schedules': ('GET', lambda i: '/volunteer-schedules', None),
+        'create_schedule': ('POST', lambda i: '/volunteer-schedules', shift),
+        'bulk_schedules': ('POST', lambda i: '/volunteer-schedules/bulk', lambda i: [shift(i) for _ in range(100)]),
+        'auto_assign': ('POST', lambda i: '/volunteer-schedules/auto-assign', auto_assign),
+        'check_schedule': ('GET', lambda i: f'/volunteer-schedules/check?volunteer_id={rng.randint(1, volunteers)}'
+                                            f'&shift_date={day.isoformat()}', None),
+        'search_pets': ('GET', lambda i: f'/search?type=pets&q={rng.choice(PET_NAMES)}&status=Available&limit=20',
+                        None),
+        'search_pets_fuzzy': ('GET', lambda i: '/search?type=pets&q=labrdor&fuzzy=1&age_max=3&limit=20', None),
+        'search_adopters': ('GET', lambda i: f'/search?type=adopters&q={rng.choice(LAST_NAMES)}&limit=20', None),
+        'stats': ('GET', lambda i: '/stats', None),
+        'stats_window': ('GET', lambda i: f'/stats?since={(day - datetime.timedelta(days=365)).isoformat()}'
+                                          f'&until={day.isoformat()}&pet_id={pet()}&pet_id={pet()}', None),
+        'jobs': ('GET', lambda i: '/jobs', None),
+        'submit_job': ('POST', lambda i: '/jobs', lambda i: {'type': 'popularity_scores'}),
+        'get_job': ('GET', lambda i: f'/jobs/{job_id}', None),
+        'get_job_result': ('GET', lambda i: f'/jobs/{job_id}/result', None),
+        'metrics': ('GET', lambda i: '/metrics', None),
+        'pool_metrics': ('GET', lambda i: '/metrics/pool', None),
+        'cache_metrics': ('GET', lambda i: '/metrics/cache', None),
+        'replication_metrics': ('GET', lambda i: '/metrics/replication', None),
+        'drain_replication': ('POST', lambda i: '/replication/drain', None),
+        'init_sample_data': ('POST', lambda i: '/init-sample-data', None),
+        'delete_pet': ('DELETE', lambda i: f'/pets/{doomed_pets[i]}', None),
+        'delete_adopter': ('DELETE', lambda i: f'/adopters/{doomed_adopters[i]}', None),
+    }
+
+
+def percentile(values, fraction):
+    # Nearest-rank percentile over an already sorted list
+    if not values:
+        return None
+    index = max(int(round(fraction * len(values) + 0.5)) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+def summarize(latencies, statuses, queries, seconds):
+    latencies = sorted(latencies)
+    ms = lambda value: round(value * 1000, 3) if value is not None else None
+    counted = [count for count in queries if count is not None]
+    return {
+        'requests': len(latencies),
+        'errors': sum(1 for status in statuses if status >= 500),
+        'client_errors': sum(1 for status in statuses if 400 <= status < 500),
+        'throughput_rps': round(len(latencies) / seconds, 1) if seconds else None,
+        'p50_ms': ms(percentile(latencies, 0.50)),
+        'p95_ms': ms(percentile(latencies, 0.95)),
+        'p99_ms': ms(percentile(latencies, 0.99)),
+        'max_ms': ms(latencies[-1] if latencies else None),
+        'queries_mean': round(sum(counted) / len(counted), 2) if counted else None,
+        'queries_max': max(counted) if counted else None
+    }
+
+
+def run_scenario(transport, scenario, requests, concurrency):
+    method, path, body = scenario
+    latencies, statuses, queries = [], [], []
+    lock = threading.Lock()
+
+    def send(i):
+        payload = body(i) if body else None
+        start = time.perf_counter()
+        status, query_count, _ = transport.request(method, path(i), payload)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            statuses.append(status)
+            queries.append(int(query_count) if query_count is not None else None)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, range(requests)))
+    return summarize(latencies, statuses, queries, time.perf_counter() - start), latencies, statuses, queries
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous or not previous.get('p95_ms') or current['p95_ms'] is None:
+            continue
+        ratio = current['p95_ms'] / previous['p95_ms']
+        more_queries = (current['queries_max'] or 0) > (previous.get('queries_max') or 0)
+        if ratio > 1 + tolerance or more_queries:
+            regressions.append({
+                'scenario': name,
+                'p95_ms': current['p95_ms'],
+                'baseline_p95_ms': previous['p95_ms'],
+                'p95_ratio': round(ratio, 2),
+                'queries_max': current['queries_max'],
+                'baseline_queries_max': previous.get('queries_max')
+            })
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--base-url', help='Send requests over HTTP to a running server')
+    parser.add_argument('--rows', type=int, default=10000, help='Rows to generate before the run')
+    parser.add_argument('--skip-seed', action='store_true')
+    parser.add_argument('--requests', type=int, default=100, help='Requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--only', help='Comma-separated scenario names to run')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Also write the report to this file')
+    parser.add_argument('--baseline', help='Earlier report to compare p95 and query counts against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed p95 growth over the baseline')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    happy_tails = None
+    if not (args.base_url and args.skip_seed):
+        happy_tails = load_app(args.database_url)
+    if not args.skip_seed:
+        with happy_tails.app.app_context():
+            generate(happy_tails, args.rows, args.seed)
+    transport = HttpTransport(args.base_url) if args.base_url else TestClientTransport(happy_tails.app)
+
+    scenarios = build_scenarios(transport, rng, args.requests)
+    if args.only:
+        names = [name.strip() for name in args.only.split(',')]
+        unknown = [name for name in names if name not in scenarios]
+        if unknown:
+            parser.error(f"Unknown scenarios: {', '.join(unknown)}")
+        scenarios = {name: scenarios[name] for name in names}
+
+    results = {}
+    all_latencies, all_statuses, all_queries = [], [], []
+    started = time.perf_counter()
+    for name, scenario in scenarios.items():
+        summary, latencies, statuses, queries = run_scenario(transport, scenario, args.requests, args.concurrency)
+        results[name] = summary
+        all_latencies += latencies
+        all_statuses += statuses
+        all_queries += queries
+
+    dialect = None
+    if happy_tails and not args.base_url:
+        with happy_tails.app.app_context():
+            dialect = happy_tails.db.engine.dialect.name
+    output = {
+        'run': {
+            'timestamp': datetime.datetime.utcnow().isoformat(),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'target': args.base_url or 'test-client',
+            'dialect': dialect,
+            'rows': None if args.skip_seed else args.rows,
+            'requests_per_scenario': args.requests,
+            'concurrency': args.concurrency
+        },
+        'overall': summarize(all_latencies, all_statuses, all_queries, time.perf_counter() - started),
+        'scenarios': results
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            output['regressions'] = compare(results, json.load(f), args.tolerance)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=2, sort_keys=True)
+    report(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""Send competing adoption decisions from many threads and verify the invariants.
+
+    python backend/benchmarks/stress_decisions.py --threads 32 --requests 2000
+    python backend/benchmarks/stress_decisions.py --database-url mysql+pymysql://...
+
+Each pet gets several pending applications. Threads then post overlapping
+batches to POST /adoption-applications/decisions, approving some
+applications and rejecting others, so reviewers race for the same pets.
+Afterwards the script checks that:
+* no pet has more than one approved application;
+* a pet is Adopted exactly when it has an approved application, and has one
+  adoption record for it;
+* Adopted pets have no pending applications left;
+* the approvals the API reported match the stored ones exactly;
+* each pet's pending_application_count matches its pending applications;
+* no request failed with a 5xx (a batch still contended after its retries
+  is answered 409 and changes nothing).
+
+It prints the counts as JSON and exits non-zero if any check fails. SQLite
+serializes writers, so run it against MySQL to exercise the row locks.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, insert, select
+
+from common import load_app, report
+
+
+def seed(happy_tails, pets, applications_per_pet):
+    db = happy_tails.db
+    db.drop_all()
+    db.create_all()
+    db.session.execute(insert(happy_tails.Pet.__table__), [
+        {'name': f'Stress Pet {i}', 'breed': 'Beagle', 'age': 2, 'weight': 10, 'health_condition': 'Good',
+         'status': 'Available', 'pending_application_count': applications_per_pet}
+        for i in range(pets)
+    ])
+    db.session.execute(insert(happy_tails.Adopter.__table__), [
+        {'full_name': f'Stress Adopter {i}', 'contact_info': f'stress{i}@example.com'}
+        for i in range(applications_per_pet)
+    ])
+    db.session.execute(insert(happy_tails.AdoptionApplication.__table__), [
+        {'pet_id': pet_id, 'adopter_id': adopter_id, 'status': 'Pending'}
+        for pet_id in range(1, pets + 1) for adopter_id in range(1, applications_per_pet + 1)
+    ])
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=500, help='Total decision batches across all threads')
+    parser.add_argument('--pets', type=int, default=50)
+    parser.add_argument('--applications-per-pet', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=10, help='Applications per decision batch')
+    parser.add_argument('--reject-ratio', type=float, default=0.3, help='Share of each batch that is rejected')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    happy_tails = load_app(args.database_url)
+    with happy_tails.app.app_context():
+        seed(happy_tails, args.pets, args.applications_per_pet)
+    applications = args.pets * args.applications_per_pet
+
+    reported = []
+    statuses = Counter()
+    conflicts = 0
+    lock = threading.Lock()
+    local = threading.local()
+
+    def submit(i):
+        nonlocal conflicts
+        rng = random.Random(args.seed * 1000003 + i)
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = happy_tails.app.test_client()
+        batch = rng.sample(range(1, applications + 1), min(args.batch_size, applications))
+        split = int(len(batch) * args.reject_ratio)
+        response = client.post('/adoption-applications/decisions',
+                               json={'reject': batch[:split], 'approve': batch[split:]})
+        with lock:
+            statuses[response.status_code] += 1
+            if response.status_code == 200:
+                reported.extend(response.json['approved'])
+                conflicts += len(response.json['conflicts'])
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        list(executor.map(submit, range(args.requests)))
+    seconds = time.perf_counter() - started
+
+    with happy_tails.app.app_context():
+        db = happy_tails.db
+        pet = happy_tails.Pet.__table__
+        application = happy_tails.AdoptionApplication.__table__
+        record = happy_tails.AdoptionRecord.__table__
+        approved = dict(db.session.execute(
+            select(application.c.application_id, application.c.pet_id).where(application.c.status == 'Approved')).all())
+        pending = dict(db.session.execute(
+            select(application.c.pet_id, func.count()).where(application.c.status == 'Pending')
+            .group_by(application.c.pet_id)).all())
+        records = Counter(db.session.execute(select(record.c.pet_id)).scalars())
+        pets = {row.pet_id: row for row in db.session.execute(
+            select(pet.c.pet_id, pet.c.status, pet.c.pending_application_count))}
+
+    approvals = Counter(approved.values())
+    adopted = {pet_id for pet_id, row in pets.items() if row.status == 'Adopted'}
+    checks = {
+        'one_approval_per_pet': all(count == 1 for count in approvals.values()),
+        'adopted_iff_approved': adopted == set(approvals),
+        'one_record_per_adoption': records == Counter(set(approvals)),
+        'no_pending_on_adopted': not adopted & set(pending),
+        'reported_matches_stored': sorted(reported) == sorted(approved),
+        'pending_counts_match': all(row.pending_application_count == pending.get(pet_id, 0)
+                                    for pet_id, row in pets.items()),
+        'no_server_errors': not any(code >= 500 for code in statuses)
+    }
+    report({
+        'threads': args.threads,
+        'batches': args.requests,
+        'seconds': round(seconds, 2),
+        'batches_per_second': round(args.requests / seconds, 1) if seconds else None,
+        'status_codes': dict(statuses),
+        'approved': len(approved),
+        'pets_adopted': len(adopted),
+        'conflicts_reported': conflicts,
+        'checks': checks
+    })
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""Hammer volunteer scheduling from many threads and verify the invariants.
+
+    python backend/benchmarks/stress_schedules.py --threads 32 --requests 2000
+    python backend/benchmarks/stress_schedules.py --database-url mysql+pymysql://...
+
+The threads submit overlapping shifts for a small pool of volunteers and
+dates through POST /volunteer-schedules and /volunteer-schedules/bulk, so
+most submissions collide. Afterwards the script checks that:
+* no (volunteer, shift_date) pair is stored twice;
+* the shifts the API reported as scheduled match the stored rows exactly;
+* every stored shift has exactly one audit row;
+* each volunteer's last_assigned_date is their latest shift.
+
+It prints the counts as JSON and exits non-zero if any check fails. SQLite
+serializes writers, so run it against MySQL to exercise real contention.
+"""
+import argparse
+import datetime
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, insert, select
+
+from common import load_app, report
+
+
+def seed(happy_tails, volunteers):
+    db = happy_tails.db
+    db.drop_all()
+    db.create_all()
+    db.session.execute(insert(happy_tails.Volunteer.__table__), [
+        {'full_name': f'Stress Volunteer {i}', 'contact_info': f'stress{i}@example.com',
+         'skills': 'Dog Walking', 'availability': 'Flexible'}
+        for i in range(volunteers)
+    ])
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=1000, help='Total submissions across all threads')
+    parser.add_argument('--volunteers', type=int, default=10)
+    parser.add_argument('--days', type=int, default=30, help='Distinct shift dates to draw from')
+    parser.add_argument('--bulk-size', type=int, default=20, help='Shifts per bulk submission')
+    parser.add_argument('--bulk-ratio', type=float, default=0.5, help='Share of submissions sent in bulk')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    happy_tails = load_app(args.database_url)
+    with happy_tails.app.app_context():
+        seed(happy_tails, args.volunteers)
+
+    start_day = datetime.date(2030, 1, 1)
+    reported = []
+    statuses = Counter()
+    lock = threading.Lock()
+    local = threading.local()
+
+    def shift(rng):
+        return {'volunteer_id': rng.randint(1, args.volunteers),
+                'shift_date': (start_day + datetime.timedelta(days=rng.randrange(args.days))).isoformat(),
+                'task_description': 'Stress shift'}
+
+    def submit(i):
+        rng = random.Random(args.seed * 1000003 + i)
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = happy_tails.app.test_client()
+        if rng.random() < args.bulk_ratio:
+            body = [shift(rng) for _ in range(args.bulk_size)]
+            response = client.post('/volunteer-schedules/bulk', json=body)
+            scheduled = []
+            if response.status_code == 200:
+                skipped = {entry['index'] for entry in response.json['duplicates'] + response.json['errors']}
+                scheduled = [(item['volunteer_id'], item['shift_date'])
+                             for index, item in enumerate(body) if index not in skipped]
+        else:
+            body = shift(rng)
+            response = client.post('/volunteer-schedules', json=body)
+            scheduled = [(body['volunteer_id'], body['shift_date'])] if response.status_code == 201 else []
+        with lock:
+            statuses[response.status_code] += 1
+            reported.extend(scheduled)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        list(executor.map(submit, range(args.requests)))
+    seconds = time.perf_counter() - started
+
+    with happy_tails.app.app_context():
+        db = happy_tails.db
+        schedule = happy_tails.VolunteerSchedule.__table__
+        audit = happy_tails.VolunteerAudit.__table__
+        volunteer = happy_tails.Volunteer.__table__
+        stored = [(row.volunteer_id, row.shift_date.isoformat())
+                  for row in db.session.execute(select(schedule.c.volunteer_id, schedule.c.shift_date))]
+        audits = Counter((row.volunteer_id, row.shift_date.isoformat())
+                         for row in db.session.execute(select(audit.c.volunteer_id, audit.c.shift_date)))
+        latest = dict(db.session.execute(
+            select(schedule.c.volunteer_id, func.max(schedule.c.shift_date)).group_by(schedule.c.volunteer_id)).all())
+        assigned = dict(db.session.execute(select(volunteer.c.volunteer_id, volunteer.c.last_assigned_date)).all())
+
+    checks = {
+        'no_duplicate_shifts': len(stored) == len(set(stored)),
+        'reported_matches_stored': Counter(reported) == Counter(stored),
+        'one_audit_per_shift': audits == Counter(stored),
+        'last_assigned_is_latest_shift': all(assigned.get(volunteer_id) == shift_date
+                                             for volunteer_id, shift_date in latest.items())
+    }
+    report({
+        'threads': args.threads,
+        'submissions': args.requests,
+        'seconds': round(seconds, 2),
+        'submissions_per_second': round(args.requests / seconds, 1) if seconds else None,
+        'status_codes': dict(statuses),
+        'shifts_reported_scheduled': len(reported),
+        'shifts_stored': len(stored),
+        'audit_rows': sum(audits.values()),
+        'checks': checks
+    })
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""Read-through cache with TTL + LRU eviction and generation-based invalidation.
+
+Entity entries (e.g. one pet's popularity) are dropped explicitly by the
+write paths. Query-shape entries (list pages, full scans) embed the current
+generation of every table they read, so bumping a table's generation makes
+all of them unreachable at once without scanning the store.
+
+LocalBackend keeps generations per process, so a write bumps them only in
+the worker that made it. Everything versioned by generation (list pages,
+ETags) is therefore only consistent across workers with RedisBackend: run
+more than one worker only with CACHE_REDIS_URL set.
+"""
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class LocalBackend:
+    """In-process store: LRU bounded to ``max_entries``, per-entry TTL."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+        # Counters restart at zero with the process, so versions derived from
+        # them are only comparable within one epoch
+        self._epoch = uuid.uuid4().hex
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    # Generation counters live apart from the LRU so they are never evicted
+    def counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def epoch(self):
+        return self._epoch
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Shared store so every worker sees the same entries and generations."""
+
+    def __init__(self, url, prefix='happy_tails:cache:'):
+        if redis is None:
+            raise RuntimeError("CACHE_REDIS_URL is set but the redis package is not installed")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.evictions = 0
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return False, None
+        return True, pickle.loads(raw)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, pickle.dumps(value), px=max(int(ttl * 1000), 1))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def counter(self, key):
+        return int(self.client.get(self.prefix + 'gen:' + key) or 0)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + 'gen:' + key)
+
+    def epoch(self):
+        # Shared by every worker; a flushed Redis starts a new epoch
+        self.client.set(self.prefix + 'gen:epoch', uuid.uuid4().hex, nx=True)
+        return self.client.get(self.prefix + 'gen:epoch').decode()
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + '*'):
+            if not key.decode().startswith(self.prefix + 'gen:'):
+                self.client.delete(key)
+
+    def size(self):
+        return None
+
+
+class Cache:
+    def __init__(self, backend=None, default_ttl=30):
+        self.backend = backend or LocalBackend()
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Generations this process bumped, per table, until changed_elsewhere
+        # has looked past them
+        self._own_generations = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, key):
+        found, value = self.backend.get(key)
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return found, value
+
+    def get_or_load(self, key, loader, ttl=None):
+        found, value = self._lookup(key)
+        if found:
+            return value
+        value = loader()
+        self.backend.set(key, value, self.default_ttl if ttl is None else ttl)
+        return value
+
+    async def get_or_load_async(self, key, loader, ttl=None):
+        # Same entries as get_or_load, for a coroutine loader; only the
+        # database read is awaited, the store itself is fast enough to call
+        # from the event loop
+        found, value = self._lookup(key)
+        if found:
+            return value
+        value = await loader()
+        self.backend.set(key, value, self.default_ttl if ttl is None else ttl)
+        return value
+
+    def entity_key(self, kind, entity_id):
+        return f'{kind}@{self.backend.counter(kind)}:{entity_id}'
+
+    def query_key(self, tables, *parts):
+        # Key for a query shape over ``tables``, tied to their current generations
+        generations = ','.join(f'{table}@{self.backend.counter(table)}' for table in tables)
+        return ':'.join(['query', generations] + [str(part) for part in parts])
+
+    def version(self, *tables):
+        """Opaque token that changes whenever any of ``tables`` is invalidated."""
+        return ':'.join([self.backend.epoch()] + [f'{table}@{self.backend.counter(table)}' for table in tables])
+
+    def invalidate(self, *keys):
+        for key in keys:
+            self.backend.delete(key)
+        with self._lock:
+            self.invalidations += len(keys)
+
+    def invalidate_entities(self, kind, entity_ids):
+        # Every key of this kind when no ids are given, otherwise just those ids
+        if entity_ids is None:
+            self.invalidate_tables(kind)
+        else:
+            self.invalidate(*(self.entity_key(kind, entity_id) for entity_id in entity_ids))
+
+    def invalidate_tables(self, *tables):
+        for table in tables:
+            generation = self.backend.incr(table)
+            with self._lock:
+                self._own_generations.setdefault(table, set()).add(generation)
+        with self._lock:
+            self.invalidations += len(tables)
+
+    def changed_elsewhere(self, table, seen):
+        """Return (current generation, whether another process bumped it after ``seen``).
+
+        Only a shared backend ever reports another process; with LocalBackend
+        every bump is this process's own.
+        """
+        current = self.backend.counter(table)
+        with self._lock:
+            own = self._own_generations.get(table, set())
+            self._own_generations[table] = {generation for generation in own if generation > current}
+        if seen is None:
+            return current, False
+        if current < seen:
+            # The shared store was flushed; nothing is known about the gap
+            return current, True
+        return current, current - seen > sum(1 for generation in own if seen < generation <= current)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        with self._lock:
+            hits, misses, invalidations = self.hits, self.misses, self.invalidations
+        lookups = hits + misses
+        return {
+            'backend': type(self.backend).__name__,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / lookups, 4) if lookups else None,
+            'invalidations': invalidations,
+            'evictions': self.backend.evictions,
+            'entries': self.backend.size()
+        }
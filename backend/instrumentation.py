@@ -0,0 +1,138 @@
+"""Per-request latency, SQL and profiling instrumentation.
+
+Flask before/after request hooks time each request, while SQLAlchemy cursor
+hooks time every statement and attribute it to the request that issued it.
+A statement shape (the SQL text with IN lists collapsed) repeated
+``n_plus_one_threshold`` times within one request is reported as a likely
+N+1. With profiling enabled, ``?profile=1`` runs the request under cProfile
+and dumps the stats to ``profile_dir``.
+"""
+import cProfile
+import logging
+import os
+import re
+import time
+from collections import Counter as ShapeCounter
+from datetime import datetime
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Statements issued by one request
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000)
+
+_whitespace = re.compile(r'\s+')
+# "IN (?, ?, ?)" / "IN (%s, %s)" / "IN (__[POSTCOMPILE_x])" all become "IN (?)"
+_in_list = re.compile(r'\bIN\s*\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+|__\[POSTCOMPILE_\w+\])\s*,?)+\)', re.IGNORECASE)
+# Multi-row VALUES lists collapse the same way
+_values_list = re.compile(r'(\))(?:\s*,\s*\([^()]*\))+')
+
+
+def statement_shape(statement):
+    shape = _whitespace.sub(' ', statement).strip()
+    shape = _in_list.sub('IN (?)', shape)
+    return _values_list.sub(r'\1', shape)
+
+
+def statement_operation(statement):
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ''
+    return keyword if keyword in ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'CALL') else 'OTHER'
+
+
+class Instrumentation:
+    def __init__(self, registry, n_plus_one_threshold=10, profiling_enabled=False, profile_dir=None):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.profiling_enabled = profiling_enabled
+        self.profile_dir = profile_dir
+        self.request_latency = registry.histogram(
+            'http_request_duration_seconds', 'Request latency by route', ('method', 'route'))
+        self.requests = registry.counter(
+            'http_requests', 'Requests by route and status code', ('method', 'route', 'status'))
+        self.request_statements = registry.histogram(
+            'http_request_sql_statements', 'SQL statements issued per request', ('method', 'route'),
+            buckets=SQL_COUNT_BUCKETS)
+        self.request_sql_time = registry.histogram(
+            'http_request_sql_duration_seconds', 'Time per request spent in SQL', ('method', 'route'))
+        self.statement_latency = registry.histogram(
+            'sql_statement_duration_seconds', 'SQL statement latency by operation', ('operation',))
+        self.n_plus_one = registry.counter(
+            'sql_n_plus_one', 'Requests that repeated one statement shape past the threshold',
+            ('method', 'route'))
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(Engine, 'handle_error', self._handle_error)
+
+    def _route(self):
+        return request.url_rule.rule if request.url_rule else 'unmatched'
+
+    def _before_request(self):
+        g.instrument_start = time.perf_counter()
+        g.sql_shapes = ShapeCounter()
+        g.sql_time = 0.0
+        g.profiler = None
+        if self.profiling_enabled and request.args.get('profile') in ('1', 'true'):
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    def _after_request(self, response):
+        start = g.get('instrument_start')
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        method, route = request.method, self._route()
+        shapes = g.sql_shapes
+        statements = sum(shapes.values())
+
+        self.request_latency.labels(method, route).observe(elapsed)
+        self.requests.labels(method, route, response.status_code).inc()
+        self.request_statements.labels(method, route).observe(statements)
+        self.request_sql_time.labels(method, route).observe(g.sql_time)
+        response.headers['X-Query-Count'] = str(statements)
+        response.headers['Server-Timing'] = f'db;dur={g.sql_time * 1000:.2f}, total;dur={elapsed * 1000:.2f}'
+
+        if shapes:
+            shape, repeats = shapes.most_common(1)[0]
+            if repeats >= self.n_plus_one_threshold:
+                self.n_plus_one.labels(method, route).inc()
+                logger.warning(f"Possible N+1 on {method} {route}: {repeats}x {shape[:200]}")
+
+        if g.profiler is not None:
+            g.profiler.disable()
+            response.headers['X-Profile'] = self._dump_profile(g.profiler, method, route)
+        return response
+
+    def _dump_profile(self, profiler, method, route):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', route).strip('_') or 'root'
+        name = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{method}-{slug}.prof"
+        path = os.path.join(self.profile_dir, name)
+        profiler.dump_stats(path)
+        return name
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('instrument_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('instrument_start')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        self.statement_latency.labels(statement_operation(statement)).observe(elapsed)
+        # Statements from job workers and the replicator only feed the global histogram
+        if has_request_context() and 'sql_shapes' in g:
+            g.sql_shapes[statement_shape(statement)] += 1
+            g.sql_time += elapsed
+
+    def _handle_error(self, context):
+        # A failed statement never reaches after_cursor_execute
+        if context.connection is not None:
+            starts = context.connection.info.get('instrument_start')
+            if starts:
+                starts.pop()
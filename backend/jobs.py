@@ -0,0 +1,146 @@
+"""In-process background job queue with a bounded worker pool.
+
+Jobs run on a ThreadPoolExecutor. Submissions beyond ``max_pending`` queued
+or running jobs are rejected with QueueFull so callers can shed load instead
+of piling up work. Finished jobs are kept (up to ``history``) so clients can
+poll for their status and result.
+"""
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+
+from metrics import Histogram
+
+
+class QueueFull(Exception):
+    """Raised when the queue already holds ``max_pending`` unfinished jobs."""
+
+
+class Job:
+    def __init__(self, job_id, job_type, params):
+        self.job_id = job_id
+        self.job_type = job_type
+        self.params = params
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.submitted_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+        self._submitted = time.perf_counter()
+        self._started = None
+        self._finished = None
+
+    @property
+    def done(self):
+        return self.status in ('succeeded', 'failed')
+
+    def to_dict(self):
+        return {
+            'job_id': self.job_id,
+            'type': self.job_type,
+            'params': self.params,
+            'status': self.status,
+            'error': self.error,
+            'submitted_at': self.submitted_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'queue_seconds': round(self._started - self._submitted, 6) if self._started else None,
+            'run_seconds': round(self._finished - self._started, 6) if self._finished else None
+        }
+
+
+class JobQueue:
+    def __init__(self, max_workers=4, max_pending=100, history=1000, context=None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.history = history
+        # Called around every job, e.g. to push a Flask app context
+        self.context = context or nullcontext
+        self._handlers = {}
+        self._jobs = OrderedDict()
+        self._pending = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self.queue_latency = Histogram()
+        self.run_latency = {}
+        self.rejected = 0
+
+    def register(self, job_type, handler):
+        self._handlers[job_type] = handler
+        self.run_latency[job_type] = Histogram()
+
+    @property
+    def job_types(self):
+        return sorted(self._handlers)
+
+    def submit(self, job_type, params=None):
+        if job_type not in self._handlers:
+            raise KeyError(job_type)
+        params = params or {}
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise QueueFull(f"{self._pending} jobs already pending")
+            job = Job(next(self._ids), job_type, params)
+            self._pending += 1
+            self._jobs[job.job_id] = job
+            self._prune()
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _prune(self):
+        # Forget the oldest finished jobs beyond the history limit
+        excess = len(self._jobs) - self.history
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done][:excess]:
+            del self._jobs[job_id]
+
+    def _run(self, job):
+        job._started = time.perf_counter()
+        job.started_at = datetime.utcnow()
+        job.status = 'running'
+        self.queue_latency.observe(job._started - job._submitted)
+        try:
+            with self.context():
+                job.result = self._handlers[job.job_type](**job.params)
+            job.status = 'succeeded'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job._finished = time.perf_counter()
+            job.finished_at = datetime.utcnow()
+            self.run_latency[job.job_type].observe(job._finished - job._started)
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self):
+        with self._lock:
+            statuses = {}
+            for job in self._jobs.values():
+                statuses[job.status] = statuses.get(job.status, 0) + 1
+            pending = self._pending
+        return {
+            'workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'pending': pending,
+            'rejected': self.rejected,
+            'jobs_by_status': statuses,
+            'queue_seconds': self.queue_latency.to_dict(),
+            'run_seconds': {job_type: histogram.to_dict()
+                            for job_type, histogram in self.run_latency.items()}
+        }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
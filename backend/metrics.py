@@ -0,0 +1,195 @@
+"""Small, dependency-free metric primitives shared by the app's stats endpoints."""
+import threading
+
+# Latency buckets in seconds, from 0.5ms up to 10s
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Thread-safe cumulative histogram in the Prometheus style."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            if value > self._max:
+                self._max = value
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+            maximum = self._max
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            running += count
+            cumulative.append((bound, running))
+        return {
+            'count': running,
+            'sum': total,
+            'max': maximum,
+            'buckets': cumulative
+        }
+
+    def to_dict(self):
+        snapshot = self.snapshot()
+        return {
+            'count': snapshot['count'],
+            'sum': round(snapshot['sum'], 6),
+            'max': round(snapshot['max'], 6),
+            'buckets': {
+                ('+Inf' if bound == float('inf') else str(bound)): count
+                for bound, count in snapshot['buckets']
+            }
+        }
+
+
+class Counter:
+    """Thread-safe monotonically increasing value."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        with self._lock:
+            return self._value
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+class MetricFamily:
+    """A named metric with one child Counter or Histogram per label set."""
+
+    def __init__(self, name, kind, documentation, labelnames, factory):
+        self.name = name
+        self.kind = kind
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._factory())
+        return child
+
+    def children(self):
+        with self._lock:
+            items = list(self._children.items())
+        return [(list(zip(self.labelnames, key)), child) for key, child in sorted(items)]
+
+    def samples(self):
+        for labels, child in self.children():
+            if self.kind == 'counter':
+                yield self.name + '_total', labels, child.value
+                continue
+            snapshot = child.snapshot()
+            for bound, count in snapshot['buckets']:
+                yield self.name + '_bucket', labels + [('le', format_value(float(bound)))], count
+            yield self.name + '_sum', labels, snapshot['sum']
+            yield self.name + '_count', labels, snapshot['count']
+
+
+class GaugeCallback:
+    """Gauge whose samples are read from a callback at scrape time.
+
+    The callback returns an iterable of (labels dict, value) pairs.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, callback):
+        self.name = name
+        self.documentation = documentation
+        self._callback = callback
+
+    def samples(self):
+        for labels, value in self._callback():
+            if value is None:
+                continue
+            yield self.name, sorted(labels.items()), value
+
+
+class Registry:
+    """Collects metric families and renders them in the Prometheus text format."""
+
+    def __init__(self, prefix=''):
+        self.prefix = prefix
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(MetricFamily(self.prefix + name, 'counter', documentation, labelnames, Counter))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(MetricFamily(self.prefix + name, 'histogram', documentation, labelnames,
+                                           lambda: Histogram(buckets)))
+
+    def gauge_callback(self, name, documentation, callback):
+        return self._register(GaugeCallback(self.prefix + name, documentation, callback))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                samples = list(metric.samples())
+            except Exception as e:
+                # One failing callback (say, an unreachable database) must not
+                # take the whole scrape down
+                lines.append(f'# {metric.name} unavailable: {e}'.replace('\n', ' '))
+                continue
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in samples:
+                lines.append(f'{name}{format_labels(labels)} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,172 @@
+"""Outbox-based replication of pet health changes to the remote store.
+
+Local writes add a row to ``pet_health_outbox`` in the same transaction as
+the pet update. OutboxReplicator drains that table in batches into
+``pet_health`` on the remote database with a single multi-row upsert per
+batch, then deletes the delivered outbox rows. Delivery is at-least-once;
+the upsert never lets an older change overwrite a newer one, so redelivery
+and concurrent drainers are harmless.
+"""
+import logging
+import threading
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, MetaData, String, TIMESTAMP, Table, func, or_, select
+
+logger = logging.getLogger(__name__)
+
+remote_metadata = MetaData()
+
+# Mirrors REMOTE_PET_HEALTH_DDL in app.py
+remote_pet_health = Table(
+    'pet_health', remote_metadata,
+    Column('pet_id', Integer, primary_key=True, autoincrement=False),
+    Column('health_condition', String(20)),
+    Column('last_updated', TIMESTAMP)
+)
+
+
+def upsert_statement(dialect_name, table, rows):
+    """Multi-row upsert that keeps whichever change has the later last_updated."""
+    if dialect_name == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).values(rows)
+        newer = or_(table.c.last_updated.is_(None), stmt.inserted.last_updated >= table.c.last_updated)
+        # MySQL applies assignments left to right, so compare before moving last_updated
+        return stmt.on_duplicate_key_update([
+            ('health_condition', func.if_(newer, stmt.inserted.health_condition, table.c.health_condition)),
+            ('last_updated', func.if_(newer, stmt.inserted.last_updated, table.c.last_updated)),
+        ])
+    if dialect_name in ('sqlite', 'postgresql'):
+        if dialect_name == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=[table.c.pet_id],
+            set_={
+                'health_condition': stmt.excluded.health_condition,
+                'last_updated': stmt.excluded.last_updated
+            },
+            where=or_(table.c.last_updated.is_(None), stmt.excluded.last_updated >= table.c.last_updated)
+        )
+    raise ValueError(f"Upserts are not supported on {dialect_name}")
+
+
+class OutboxReplicator:
+    def __init__(self, local_engine, remote_engine, outbox, remote_table=remote_pet_health,
+                 batch_size=500, poll_interval=1.0, max_backoff=60.0):
+        self.local_engine = local_engine
+        self.remote_engine = remote_engine
+        self.outbox = outbox
+        self.remote_table = remote_table
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.replicated = 0
+        self.batches = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.last_success_at = None
+        self.last_batch_lag = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def drain_once(self):
+        """Replicate one batch; returns how many outbox rows were delivered."""
+        outbox = self.outbox
+        with self.local_engine.connect() as conn:
+            query = select(outbox.c.outbox_id, outbox.c.pet_id, outbox.c.health_condition,
+                           outbox.c.created_at).order_by(outbox.c.outbox_id).limit(self.batch_size)
+            if conn.dialect.name == 'mysql':
+                # Claim the batch so other workers' replicators skip it
+                query = query.with_for_update(skip_locked=True)
+            rows = conn.execute(query).all()
+            if not rows:
+                conn.rollback()
+                return 0
+
+            # Only the latest change per pet needs to leave the building
+            latest = {}
+            for row in rows:
+                latest[row.pet_id] = {
+                    'pet_id': row.pet_id,
+                    'health_condition': row.health_condition,
+                    'last_updated': row.created_at
+                }
+            ids = [row.outbox_id for row in rows]
+            try:
+                with self.remote_engine.begin() as remote:
+                    remote.execute(upsert_statement(remote.dialect.name, self.remote_table,
+                                                    list(latest.values())))
+            except Exception:
+                conn.rollback()
+                with self.local_engine.begin() as retry:
+                    retry.execute(outbox.update().where(outbox.c.outbox_id.in_(ids))
+                                  .values(attempts=outbox.c.attempts + 1))
+                raise
+
+            conn.execute(outbox.delete().where(outbox.c.outbox_id.in_(ids)))
+            conn.commit()
+
+        self.replicated += len(rows)
+        self.batches += 1
+        self.last_success_at = datetime.utcnow()
+        self.last_batch_lag = (self.last_success_at - rows[-1].created_at).total_seconds()
+        return len(rows)
+
+    def drain(self):
+        """Deliver everything currently in the outbox."""
+        total = 0
+        while True:
+            delivered = self.drain_once()
+            total += delivered
+            if delivered < self.batch_size:
+                return total
+
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                delivered = self.drain_once()
+                self.consecutive_failures = 0
+            except Exception as e:
+                self.failures += 1
+                self.consecutive_failures += 1
+                self.last_error = str(e)
+                logger.error(f"Error replicating pet health: {str(e)}")
+                # Exponential backoff while the remote is unavailable
+                self._stop.wait(min(self.poll_interval * 2 ** self.consecutive_failures, self.max_backoff))
+                continue
+            if delivered < self.batch_size:
+                self._stop.wait(self.poll_interval)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name='pet-health-replicator', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def stats(self):
+        outbox = self.outbox
+        with self.local_engine.connect() as conn:
+            pending, oldest = conn.execute(
+                select(func.count(), func.min(outbox.c.created_at))).one()
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'pending': pending,
+            'lag_seconds': (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0,
+            'last_batch_lag_seconds': self.last_batch_lag,
+            'replicated': self.replicated,
+            'batches': self.batches,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'last_success_at': self.last_success_at.isoformat() if self.last_success_at else None
+        }
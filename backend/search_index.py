@@ -0,0 +1,601 @@
+"""In-memory inverted index behind GET /search.
+
+A Collection maps the words of its text fields, and the values of its keyword
+fields, to posting lists: sorted lists of entity ids. Each query term and
+filter becomes a cursor over one or more posting lists. The cursors are
+intersected leapfrog-style: every cursor seeks past the current candidate
+with bisect, so a query touches a few entries per result rather than whole
+lists, and it stops once it has a page.
+
+* Prefix matching finds the vocabulary range with bisect.
+* Fuzzy matching (one edit) looks terms up in a deletion neighbourhood of the
+  fuzzy fields' vocabulary, then confirms each candidate with an optimal
+  string alignment check.
+* Range fields keep a sorted (value, id) list. A narrow range becomes one
+  more cursor; a wide one is checked per candidate.
+
+The index never reads the database on its own. Writers mark what changed:
+ids, rows appended past the highest indexed id, id ranges, or a whole
+collection. The next query on that collection reloads just that through
+the collection's loader before it answers. Each process holds its own index, so
+writes made by other processes have to be marked too; app.py marks a table
+stale when another worker bumps its shared cache generation.
+"""
+import bisect
+import re
+import threading
+import time
+from collections import OrderedDict
+
+TEXT = 'text'
+KEYWORD = 'keyword'
+RANGE = 'range'
+
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+# Shorter words, and words with digits, are not matched fuzzily
+FUZZY_MIN_LENGTH = 4
+# A term expanding to more words than this is merged into one cached list
+UNION_CURSOR_LIMIT = 32
+MERGED_CACHE_SIZE = 256
+# Ranges holding at most this many ids are sorted into a cursor; wider ones
+# are checked per candidate
+RANGE_MATERIALIZE_LIMIT = 4096
+# Reloads of dirty ids go out in IN lists of this size
+RELOAD_CHUNK_SIZE = 1000
+# Values per SortedList chunk; chunks split at twice this
+CHUNK_SIZE = 1000
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def deletions(term):
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def within_one_edit(a, b):
+    # Optimal string alignment distance <= 1: one insertion, deletion,
+    # substitution or adjacent transposition
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diffs) == 1:
+            return True
+        return (len(diffs) == 2 and diffs[1] == diffs[0] + 1
+                and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]])
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+
+def insert_sorted(items, value):
+    # Ids mostly arrive in ascending order, so appending is the common case
+    if not items or items[-1] < value:
+        items.append(value)
+    else:
+        index = bisect.bisect_left(items, value)
+        if index == len(items) or items[index] != value:
+            items.insert(index, value)
+
+
+def remove_sorted(items, value):
+    index = bisect.bisect_left(items, value)
+    if index < len(items) and items[index] == value:
+        del items[index]
+
+
+def difference(doc, other):
+    # The parts of an analyzed row that another version of it lacks
+    terms, fuzzy, keywords, ranges = doc
+    other_terms, other_fuzzy, other_keywords, other_ranges = other
+    return (terms - other_terms, fuzzy - other_fuzzy, keywords - other_keywords,
+            {name: value for name, value in ranges.items() if other_ranges.get(name) != value})
+
+
+class SortedList:
+    """Sorted values kept in chunks, so an insert or delete shifts one chunk
+    rather than the whole list. Holds the vocabulary and the range fields,
+    where new values land anywhere in the order.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.maxes = []
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            yield from chunk
+
+    def _load(self, items):
+        self.chunks = [items[start:start + CHUNK_SIZE] for start in range(0, len(items), CHUNK_SIZE)]
+        self.maxes = [chunk[-1] for chunk in self.chunks]
+        self.length = len(items)
+
+    def add(self, value):
+        if not self.chunks:
+            self._load([value])
+            return
+        index = min(bisect.bisect_left(self.maxes, value), len(self.chunks) - 1)
+        chunk = self.chunks[index]
+        bisect.insort(chunk, value)
+        self.maxes[index] = chunk[-1]
+        self.length += 1
+        if len(chunk) > 2 * CHUNK_SIZE:
+            self.chunks[index:index + 1] = [chunk[:CHUNK_SIZE], chunk[CHUNK_SIZE:]]
+            self.maxes[index:index + 1] = [chunk[CHUNK_SIZE - 1], chunk[-1]]
+
+    def update(self, values):
+        values = sorted(values)
+        if len(values) > CHUNK_SIZE and len(values) * 8 > self.length:
+            # Large loads: one sort of everything beats an insert each
+            items = list(self)
+            items.extend(values)
+            items.sort()
+            self._load(items)
+        else:
+            for value in values:
+                self.add(value)
+
+    def discard(self, value):
+        index = bisect.bisect_left(self.maxes, value)
+        if index == len(self.chunks):
+            return
+        chunk = self.chunks[index]
+        position = bisect.bisect_left(chunk, value)
+        if position < len(chunk) and chunk[position] == value:
+            del chunk[position]
+            self.length -= 1
+            if chunk:
+                self.maxes[index] = chunk[-1]
+            else:
+                del self.chunks[index]
+                del self.maxes[index]
+
+    def rank(self, value):
+        # How many values sort before ``value``
+        index = bisect.bisect_left(self.maxes, value)
+        if index == len(self.chunks):
+            return self.length
+        return sum(map(len, self.chunks[:index])) + bisect.bisect_left(self.chunks[index], value)
+
+    def irange(self, low, high):
+        # Values from ``low`` up to, but excluding, ``high``
+        index = bisect.bisect_left(self.maxes, low)
+        position = bisect.bisect_left(self.chunks[index], low) if index < len(self.chunks) else 0
+        for chunk in self.chunks[index:]:
+            for value in chunk[position:]:
+                if value >= high:
+                    return
+                yield value
+            position = 0
+
+
+class Field:
+    """How one column is indexed.
+
+    TEXT columns are split into words for free-text terms. KEYWORD columns
+    are matched whole (case-insensitively) by filters. A separator splits a
+    keyword column into several values, and text=True indexes its words as
+    well. RANGE columns are numeric and filtered by bounds.
+    """
+
+    def __init__(self, kind, fuzzy=False, separator=None, text=False):
+        self.kind = kind
+        self.fuzzy = fuzzy
+        self.separator = separator
+        self.text = text or kind == TEXT
+
+
+class ListCursor:
+    __slots__ = ('items', 'position')
+
+    def __init__(self, items):
+        self.items = items
+        self.position = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def seek(self, target):
+        # Smallest id >= target; targets only grow, so bisect from the last hit
+        self.position = bisect.bisect_left(self.items, target, self.position)
+        return self.items[self.position] if self.position < len(self.items) else None
+
+
+class UnionCursor:
+    def __init__(self, lists):
+        self.cursors = [ListCursor(items) for items in lists]
+
+    def __len__(self):
+        return sum(len(cursor) for cursor in self.cursors)
+
+    def seek(self, target):
+        found = None
+        for cursor in self.cursors:
+            value = cursor.seek(target)
+            if value is not None and (found is None or value < found):
+                found = value
+        return found
+
+
+def cursor_for(lists):
+    return ListCursor(lists[0]) if len(lists) == 1 else UnionCursor(lists)
+
+
+def leapfrog(cursors, predicates, after, limit):
+    """Ascending ids above ``after`` on every cursor and passing every predicate.
+
+    Returns (up to ``limit`` ids, whether more follow).
+    """
+    found = []
+    target = 0 if after is None else after + 1
+    agreed = index = 0
+    while True:
+        value = cursors[index].seek(target)
+        if value is None:
+            return found, False
+        if value == target:
+            agreed += 1
+        else:
+            target, agreed = value, 1
+        if agreed == len(cursors):
+            if all(predicate(target) for predicate in predicates):
+                if len(found) == limit:
+                    return found, True
+                found.append(target)
+            target += 1
+            agreed = 0
+        index = (index + 1) % len(cursors)
+
+
+class Collection:
+    """Inverted index over one table's rows, keyed by primary key."""
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.lock = threading.RLock()
+        self.ids = []
+        self.docs = {}
+        self.postings = {}
+        self.terms = SortedList()
+        self.keywords = {}
+        self.variants = {}
+        self.fuzzy_refs = {}
+        self.ranges = {name: SortedList() for name, field in fields.items() if field.kind == RANGE}
+        self.values = {name: {} for name in self.ranges}
+        self.version = 0
+        self._merged = OrderedDict()
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def max_id(self):
+        return self.ids[-1] if self.ids else 0
+
+    def analyze(self, row):
+        """(words, fuzzy words, (field, value) keywords, {field: number}) for a row."""
+        terms, fuzzy, keywords, ranges = set(), set(), set(), {}
+        for name, field in self.fields.items():
+            value = row[name]
+            if value is None:
+                continue
+            if field.kind == RANGE:
+                ranges[name] = float(value)
+                continue
+            if field.kind == KEYWORD:
+                parts = value.split(field.separator) if field.separator else [value]
+                keywords.update((name, part.strip().lower()) for part in parts if part.strip())
+            if field.text:
+                words = tokenize(value)
+                terms.update(words)
+                if field.fuzzy:
+                    fuzzy.update(word for word in words if len(word) >= FUZZY_MIN_LENGTH and word.isalpha())
+        return terms, fuzzy, keywords, ranges
+
+    def add_many(self, rows):
+        """Index (id, row) pairs. A changed row only touches what changed."""
+        with self.lock:
+            new_terms = []
+            new_ranges = {name: [] for name in self.ranges}
+            for doc_id, row in rows:
+                doc = self.analyze(row)
+                old = self.docs.get(doc_id)
+                if old is None:
+                    insert_sorted(self.ids, doc_id)
+                    self._index(doc_id, doc, new_terms, new_ranges)
+                else:
+                    self._unindex(doc_id, difference(old, doc))
+                    self._index(doc_id, difference(doc, old), new_terms, new_ranges)
+                self.docs[doc_id] = doc
+            # Words and values added and dropped again within the batch are left out
+            self.terms.update({term for term in new_terms if term in self.postings})
+            for name, entries in new_ranges.items():
+                self.ranges[name].update(entry for entry in entries if self.values[name].get(entry[1]) == entry[0])
+            self.version += 1
+
+    def remove_many(self, doc_ids):
+        with self.lock:
+            for doc_id in doc_ids:
+                doc = self.docs.pop(doc_id, None)
+                if doc is not None:
+                    remove_sorted(self.ids, doc_id)
+                    self._unindex(doc_id, doc)
+            self.version += 1
+
+    def _index(self, doc_id, doc, new_terms, new_ranges):
+        terms, fuzzy, keywords, ranges = doc
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = []
+                new_terms.append(term)
+            insert_sorted(posting, doc_id)
+        for term in fuzzy:
+            refs = self.fuzzy_refs.get(term, 0)
+            if not refs:
+                for variant in deletions(term) | {term}:
+                    self.variants.setdefault(variant, set()).add(term)
+            self.fuzzy_refs[term] = refs + 1
+        for keyword in keywords:
+            insert_sorted(self.keywords.setdefault(keyword, []), doc_id)
+        for name, value in ranges.items():
+            new_ranges[name].append((value, doc_id))
+            self.values[name][doc_id] = value
+
+    def _unindex(self, doc_id, doc):
+        terms, fuzzy, keywords, ranges = doc
+        for term in terms:
+            posting = self.postings[term]
+            remove_sorted(posting, doc_id)
+            if not posting:
+                del self.postings[term]
+                self.terms.discard(term)
+        for term in fuzzy:
+            self.fuzzy_refs[term] -= 1
+            if not self.fuzzy_refs[term]:
+                del self.fuzzy_refs[term]
+                for variant in deletions(term) | {term}:
+                    self.variants[variant].discard(term)
+                    if not self.variants[variant]:
+                        del self.variants[variant]
+        for keyword in keywords:
+            posting = self.keywords[keyword]
+            remove_sorted(posting, doc_id)
+            if not posting:
+                del self.keywords[keyword]
+        for name, value in ranges.items():
+            self.ranges[name].discard((value, doc_id))
+            if self.values[name].get(doc_id) == value:
+                del self.values[name][doc_id]
+
+    def ids_between(self, low, high):
+        start = bisect.bisect_left(self.ids, low)
+        return self.ids[start:bisect.bisect_right(self.ids, high, start)]
+
+    def expand(self, term, prefix, fuzzy):
+        """Words a query term matches: itself, words it prefixes, words one edit away."""
+        words = []
+        if prefix:
+            words.extend(self.terms.irange(term, term + '\U0010ffff'))
+        elif term in self.postings:
+            words.append(term)
+        if fuzzy and len(term) >= FUZZY_MIN_LENGTH:
+            seen = set(words)
+            for variant in deletions(term) | {term}:
+                for candidate in self.variants.get(variant, ()):
+                    if candidate not in seen and within_one_edit(term, candidate):
+                        seen.add(candidate)
+                        words.append(candidate)
+        return words
+
+    def term_cursor(self, term, prefix, fuzzy):
+        words = self.expand(term, prefix, fuzzy)
+        if not words:
+            return None
+        if len(words) <= UNION_CURSOR_LIMIT:
+            return cursor_for([self.postings[word] for word in words])
+        # e.g. a one-letter prefix: merge once per index version
+        key = (term, prefix, fuzzy)
+        cached = self._merged.get(key)
+        if cached is None or cached[0] != self.version:
+            merged = sorted(set().union(*(self.postings[word] for word in words)))
+            cached = self._merged[key] = (self.version, merged)
+            while len(self._merged) > MERGED_CACHE_SIZE:
+                self._merged.popitem(last=False)
+        self._merged.move_to_end(key)
+        return ListCursor(cached[1])
+
+    def range_filter(self, name, low, high):
+        # Returns a cursor, a predicate, or None when nothing is in range
+        entries = self.ranges[name]
+        low_key = (float('-inf') if low is None else low, float('-inf'))
+        high_key = (float('inf') if high is None else high, float('inf'))
+        count = entries.rank(high_key) - entries.rank(low_key)
+        if count <= 0:
+            return None
+        if count <= RANGE_MATERIALIZE_LIMIT:
+            return ListCursor(sorted(doc_id for _, doc_id in entries.irange(low_key, high_key)))
+        values = self.values[name]
+
+        def in_range(doc_id):
+            value = values.get(doc_id)
+            return value is not None and (low is None or value >= low) and (high is None or value <= high)
+        return in_range
+
+    def search(self, terms=(), keywords=None, ranges=None, prefix=True, fuzzy=False, after=None, limit=20):
+        """Ids matching every term, keyword filter and range, ascending after ``after``.
+
+        ``keywords`` maps a field to the values it may take (any of them);
+        ``ranges`` maps a field to (low, high), either of which may be None.
+        Returns (ids, whether more follow).
+        """
+        with self.lock:
+            cursors, predicates = [], []
+            for term in terms:
+                cursor = self.term_cursor(term, prefix, fuzzy)
+                if cursor is None:
+                    return [], False
+                cursors.append(cursor)
+            for name, values in (keywords or {}).items():
+                lists = [self.keywords[(name, value.lower())] for value in values
+                         if (name, value.lower()) in self.keywords]
+                if not lists:
+                    return [], False
+                cursors.append(cursor_for(lists))
+            for name, (low, high) in (ranges or {}).items():
+                check = self.range_filter(name, low, high)
+                if check is None:
+                    return [], False
+                if callable(check):
+                    predicates.append(check)
+                else:
+                    cursors.append(check)
+            if not cursors:
+                cursors.append(ListCursor(self.ids))
+            # The shortest list drives the intersection
+            cursors.sort(key=len)
+            return leapfrog(cursors, predicates, after, limit)
+
+
+class IndexedTable:
+    """A collection plus the changes marked against it since it was loaded."""
+
+    def __init__(self, fields, loader):
+        self.fields = fields
+        # loader(ids=None, after=None, between=None) -> iterable of (id, row)
+        self.loader = loader
+        self.collection = None
+        self.built_at = None
+        self.stale = True
+        self.appended = False
+        self.dirty_ids = set()
+        self.dirty_ranges = []
+        self.pending_lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+
+    def take_pending(self):
+        with self.pending_lock:
+            pending = self.stale, self.appended, self.dirty_ids, self.dirty_ranges
+            self.stale, self.appended, self.dirty_ids, self.dirty_ranges = False, False, set(), []
+        return pending
+
+    def restore_pending(self, pending):
+        # A failed refresh hands its marks back for the next query
+        stale, appended, dirty_ids, dirty_ranges = pending
+        with self.pending_lock:
+            self.stale = self.stale or stale
+            self.appended = self.appended or appended
+            self.dirty_ids.update(dirty_ids)
+            self.dirty_ranges.extend(dirty_ranges)
+
+    def refresh(self, max_age=0):
+        if self.collection is not None and not self.refresh_lock.acquire(blocking=False):
+            # Someone else is refreshing; answer from what is indexed now
+            return self.collection
+        if self.collection is None:
+            self.refresh_lock.acquire()
+        try:
+            if max_age and self.built_at is not None and time.monotonic() - self.built_at > max_age:
+                self.stale = True
+            pending = self.take_pending()
+            try:
+                return self.apply(*pending)
+            except Exception:
+                self.restore_pending(pending)
+                raise
+        finally:
+            self.refresh_lock.release()
+
+    def apply(self, stale, appended, dirty_ids, dirty_ranges):
+        if stale or self.collection is None:
+            # Built aside and swapped in, so queries keep running meanwhile
+            collection = Collection(self.fields)
+            collection.add_many(self.loader())
+            self.collection, self.built_at = collection, time.monotonic()
+            return collection
+        # Rows are read before add_many takes the collection's lock, so
+        # queries do not wait on the database
+        collection = self.collection
+        if appended:
+            collection.add_many(list(self.loader(after=collection.max_id)))
+        for low, high in dirty_ranges:
+            self.reload(collection, list(self.loader(between=(low, high))), collection.ids_between(low, high))
+        dirty_ids = sorted(dirty_ids)
+        for start in range(0, len(dirty_ids), RELOAD_CHUNK_SIZE):
+            chunk = dirty_ids[start:start + RELOAD_CHUNK_SIZE]
+            self.reload(collection, list(self.loader(ids=chunk)), chunk)
+        return collection
+
+    def reload(self, collection, rows, expected_ids):
+        # Ids that were expected but not read back have been deleted
+        found = {doc_id for doc_id, _ in rows}
+        collection.remove_many([doc_id for doc_id in expected_ids if doc_id not in found])
+        collection.add_many(rows)
+
+
+class SearchIndex:
+    """Indexed tables by name, and the marks writers use to keep them current.
+
+    Mark after the write has committed: a reload started before the commit
+    would read the old row and drop the mark.
+    """
+
+    def __init__(self, max_age=0):
+        # Seconds before a table is rebuilt regardless of marks; bounds the
+        # staleness from writes this process never sees. 0 disables it.
+        self.max_age = max_age
+        self.tables = {}
+
+    def register(self, name, fields, loader):
+        self.tables[name] = IndexedTable(fields, loader)
+
+    def collection(self, name):
+        return self.tables[name].refresh(self.max_age)
+
+    def mark(self, name, ids):
+        table = self.tables.get(name)
+        if table is not None:
+            with table.pending_lock:
+                table.dirty_ids.update(ids)
+
+    def mark_appended(self, name):
+        table = self.tables.get(name)
+        if table is not None:
+            with table.pending_lock:
+                table.appended = True
+
+    def mark_range(self, name, low, high):
+        table = self.tables.get(name)
+        if table is not None:
+            with table.pending_lock:
+                table.dirty_ranges.append((low, high))
+
+    def mark_stale(self, *names):
+        for name in names or list(self.tables):
+            table = self.tables.get(name)
+            if table is not None:
+                with table.pending_lock:
+                    table.stale = True
+
+    def stats(self):
+        return {
+            name: {
+                'built': table.collection is not None,
+                'entities': len(table.collection) if table.collection is not None else 0,
+                'terms': len(table.collection.terms) if table.collection is not None else 0,
+                'age_seconds': round(time.monotonic() - table.built_at, 1) if table.built_at is not None else None
+            }
+            for name, table in self.tables.items()
+        }
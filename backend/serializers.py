@@ -0,0 +1,128 @@
+"""Row-tuple JSON serialization for the list, stream and ranked endpoints.
+
+A RowSerializer is built once per (table, selected columns). It looks at
+each column's type up front and keeps an encoder only for the columns that
+need one: dates and timestamps become ISO strings, and DECIMAL becomes a
+float. It then turns Core/``with_entities`` rows into the same dicts the
+models' ``to_dict`` methods return, without loading ORM objects.
+
+Encoding uses orjson when it is installed and falls back to the stdlib json
+module otherwise. Set JSON_BACKEND to force one of them. Keys are sorted
+either way, as they are with Flask's jsonify.
+"""
+import json
+import os
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import Response
+from sqlalchemy import Date, DateTime, Numeric, Time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def encode_decimal(value):
+    # Matches to_dict: zero and NULL weights both come out as null
+    return float(value) if value else None
+
+
+def encode_temporal(value):
+    return value.isoformat() if value is not None else None
+
+
+def encoder_for(column_type):
+    if isinstance(column_type, (Date, DateTime, Time)):
+        return encode_temporal
+    if isinstance(column_type, Numeric) and column_type.asdecimal:
+        return encode_decimal
+    return None
+
+
+def encode_value(value):
+    # Type-sniffing fallback for values whose column type is unknown
+    if isinstance(value, Decimal):
+        return encode_decimal(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+class RowSerializer:
+    def __init__(self, columns):
+        self.names = tuple(column.name for column in columns)
+        self.encoders = tuple(
+            (index, encoder)
+            for index, encoder in ((index, encoder_for(column.type)) for index, column in enumerate(columns))
+            if encoder is not None
+        )
+
+    def row(self, row):
+        values = list(row[:len(self.names)])
+        for index, encoder in self.encoders:
+            values[index] = encoder(values[index])
+        return dict(zip(self.names, values))
+
+    def rows(self, rows):
+        return [self.row(row) for row in rows]
+
+    def obj(self, instance):
+        # Same output from a loaded ORM instance
+        return self.row(tuple(getattr(instance, name) for name in self.names))
+
+    def ndjson(self, rows):
+        return b''.join(dumps(self.row(row)) + b'\n' for row in rows)
+
+
+_serializers = {}
+_serializers_lock = threading.Lock()
+
+
+def serializer_for(model_or_table, columns=None):
+    """Cached RowSerializer for ``columns`` (default: every column) of a table."""
+    table = getattr(model_or_table, '__table__', model_or_table)
+    columns = tuple(columns if columns is not None else table.columns)
+    key = (table.name, tuple(column.name for column in columns))
+    serializer = _serializers.get(key)
+    if serializer is None:
+        with _serializers_lock:
+            serializer = _serializers.setdefault(key, RowSerializer(columns))
+    return serializer
+
+
+def _default(value):
+    encoded = encode_value(value)
+    if encoded is value:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return encoded
+
+
+def _orjson_dumps(obj):
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj, default=_default, sort_keys=True, separators=(',', ':')).encode()
+
+
+def select_backend(name='auto'):
+    if name == 'orjson' or (name == 'auto' and orjson is not None):
+        if orjson is None:
+            raise RuntimeError("JSON_BACKEND is orjson but the orjson package is not installed")
+        return 'orjson', _orjson_dumps
+    return 'json', _stdlib_dumps
+
+
+JSON_BACKEND, _dumps = select_backend(os.environ.get('JSON_BACKEND', 'auto'))
+
+
+def dumps(obj):
+    """Encode ``obj`` to compact, key-sorted JSON bytes."""
+    return _dumps(obj)
+
+
+def json_response(obj, status=200):
+    return Response(dumps(obj), status=status, mimetype='application/json')
@@ -0,0 +1,28 @@
+"""Fixtures for the backend tests.
+
+The app reads DATABASE_URL when it is imported, so it is set here first: a
+throwaway SQLite file by default, or TEST_DATABASE_URL to run against MySQL
+with the stored routines and triggers installed by bootstrap_schema.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='session')
+def happy_tails():
+    os.environ['DATABASE_URL'] = os.environ.get('TEST_DATABASE_URL') or 'sqlite:///' + os.path.join(
+        tempfile.mkdtemp(prefix='happy_tails_test_'), 'test.db')
+    os.environ.setdefault('REPLICATION_ENABLED', 'false')
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    import app as happy_tails
+    with happy_tails.app.app_context():
+        happy_tails.init_db()
+        happy_tails.bootstrap_schema()
+        yield happy_tails
+        happy_tails.db.session.remove()
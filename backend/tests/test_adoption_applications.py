@@ -0,0 +1,16 @@
+"""POST /adoption-applications rejects bad bodies with the bulk endpoint's
+row errors instead of failing with a 500."""
+import pytest
+
+
+@pytest.mark.parametrize('body, error', [
+    ({'adopter_id': 1, 'status': 'Pending'}, 'Missing field: pet_id'),
+    ({'pet_id': 'one', 'adopter_id': 1, 'status': 'Pending'}, 'Invalid value'),
+    ({'pet_id': 1, 'adopter_id': 1, 'status': 'Maybe'}, 'Invalid status: Maybe'),
+    ({'pet_id': 999999, 'adopter_id': 1, 'status': 'Pending'}, 'Pet 999999 does not exist'),
+    ([{'pet_id': 1}], 'Request body must be a JSON object'),
+])
+def test_invalid_application_is_rejected(happy_tails, body, error):
+    response = happy_tails.app.test_client().post('/adoption-applications', json=body)
+    assert response.status_code == 400
+    assert response.json == {'error': error}
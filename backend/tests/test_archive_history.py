@@ -0,0 +1,33 @@
+"""volunteer_audit rows are archived by when they were written, not by the
+date of the shift they record."""
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert, select
+
+
+def test_audit_rows_archive_by_update_timestamp(happy_tails):
+    db = happy_tails.db
+    volunteer = happy_tails.Volunteer(full_name='Archive Volunteer', contact_info='archive@example.com')
+    db.session.add(volunteer)
+    db.session.commit()
+    now = datetime.utcnow().replace(microsecond=0)
+    audit = happy_tails.VolunteerAudit.__table__
+    db.session.execute(insert(audit), [
+        # An old shift booked just now stays hot
+        {'volunteer_id': volunteer.volunteer_id, 'shift_date': date(2015, 6, 1), 'update_timestamp': now},
+        # A current shift whose audit row is years old is archived
+        {'volunteer_id': volunteer.volunteer_id, 'shift_date': date.today(),
+         'update_timestamp': now - timedelta(days=2000)},
+        {'volunteer_id': volunteer.volunteer_id, 'shift_date': date(2015, 6, 1), 'update_timestamp': None}
+    ])
+    db.session.commit()
+
+    result = happy_tails.archive_history(horizon_days=365)
+
+    assert result['tables']['volunteer_audit']['rows_archived'] == 1
+    archive = happy_tails.VolunteerAuditArchive.__table__
+    archived = db.session.execute(select(archive.c.shift_date, archive.c.update_timestamp)).all()
+    assert archived == [(date.today(), now - timedelta(days=2000))]
+    hot = db.session.execute(select(audit.c.update_timestamp).where(
+        audit.c.volunteer_id == volunteer.volunteer_id).order_by(audit.c.audit_id)).scalars().all()
+    assert hot == [now, None]
@@ -0,0 +1,25 @@
+"""The /pets ETag must change for writes this process did not make, such as
+another worker deleting a pet, even though no cache generation moved."""
+from sqlalchemy import delete
+
+
+def test_delete_outside_the_app_changes_pets_etag(happy_tails):
+    db = happy_tails.db
+    pets = [happy_tails.Pet(name=f'Etag Pet {i}', breed='Beagle', age=2, weight=10, health_condition='Good')
+            for i in range(3)]
+    db.session.add_all(pets)
+    db.session.commit()
+    client = happy_tails.app.test_client()
+    first = client.get('/pets')
+    etag = first.headers['ETag']
+    assert client.get('/pets', headers={'If-None-Match': etag}).status_code == 304
+
+    # Not the newest pet, so MAX(pet_id) and MAX(last_updated) stay the same
+    table = happy_tails.Pet.__table__
+    db.session.execute(delete(table).where(table.c.pet_id == pets[0].pet_id))
+    db.session.commit()
+
+    second = client.get('/pets', headers={'If-None-Match': etag})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != etag
+    assert len(second.json) == len(first.json) - 1
@@ -0,0 +1,17 @@
+"""Federated health updates are validated before anything reaches the outbox,
+which the replicator would push to the remote store unchecked."""
+import pytest
+
+
+@pytest.mark.parametrize('path', ['/update-health-federated', '/update-health-federated?async=1'])
+@pytest.mark.parametrize('body', [{}, {'health_condition': 'Sparkly'}])
+def test_invalid_health_condition_is_rejected(happy_tails, path, body):
+    pet = happy_tails.Pet(name='Federated Pet', breed='Beagle', age=2, weight=10, health_condition='Good')
+    happy_tails.db.session.add(pet)
+    happy_tails.db.session.commit()
+    queued = happy_tails.PetHealthOutbox.query.count()
+
+    response = happy_tails.app.test_client().put(f'/pets/{pet.pet_id}{path}', json=body)
+
+    assert response.status_code == 400
+    assert happy_tails.PetHealthOutbox.query.count() == queued
@@ -0,0 +1,26 @@
+"""POST /jobs checks params with the same rules as the synchronous routes,
+so bad input is a 400 rather than a job that fails in the worker."""
+import pytest
+
+
+@pytest.mark.parametrize('job_type, params', [
+    ('archive_history', {'horizon_days': -1}),
+    ('archive_history', {'horizon_days': 'soon'}),
+    ('archive_history', {'horizon': 30}),
+    ('update_pet_health_federated', {'pet_id': 1, 'health_condition': 'Sparkly'}),
+    ('update_pet_health_federated', {'health_condition': 'Good'}),
+    ('update_vaccinations', {'batch_size': -5}),
+    ('vaccination_sweep', {'sweep_id': 999999}),
+    ('auto_assign_shifts', {'start_date': '2030-01-02', 'end_date': '2030-01-01', 'skills': ['Cleaning']}),
+    ('popularity_scores', {'version': 'x'}),
+])
+def test_invalid_job_params_are_rejected(happy_tails, job_type, params):
+    response = happy_tails.app.test_client().post('/jobs', json={'type': job_type, 'params': params})
+    assert response.status_code == 400
+    assert 'error' in response.json
+
+
+def test_valid_job_params_are_queued(happy_tails):
+    response = happy_tails.app.test_client().post('/jobs', json={'type': 'archive_history',
+                                                                  'params': {'horizon_days': '3650'}})
+    assert response.status_code == 202
@@ -0,0 +1,59 @@
+"""pet.last_updated drives the six-month vaccination rule, so the derived
+popularity columns must be maintained without touching it."""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+OLD = datetime(2020, 1, 1)
+
+
+@pytest.fixture
+def pet(happy_tails):
+    db = happy_tails.db
+    adopter = happy_tails.Adopter(full_name='Test Adopter', contact_info='test@example.com')
+    pet = happy_tails.Pet(name='Test Pet', breed='Beagle', age=2, weight=10, health_condition='Fair')
+    db.session.add_all([adopter, pet])
+    db.session.commit()
+    table = happy_tails.Pet.__table__
+    db.session.execute(table.update().where(table.c.pet_id == pet.pet_id).values(last_updated=OLD))
+    db.session.commit()
+    yield pet.pet_id, adopter.adopter_id
+    db.session.rollback()
+
+
+def stored(happy_tails, pet_id):
+    table = happy_tails.Pet.__table__
+    happy_tails.db.session.commit()
+    return happy_tails.db.session.execute(
+        select(table.c.last_updated, table.c.pending_application_count).where(table.c.pet_id == pet_id)).one()
+
+
+def test_application_insert_and_delete_keep_last_updated(happy_tails, pet):
+    pet_id, adopter_id = pet
+    db = happy_tails.db
+    application = happy_tails.AdoptionApplication(pet_id=pet_id, adopter_id=adopter_id, status='Pending')
+    db.session.add(application)
+    db.session.commit()
+    assert stored(happy_tails, pet_id) == (OLD, 1)
+
+    db.session.delete(application)
+    db.session.commit()
+    assert stored(happy_tails, pet_id) == (OLD, 0)
+
+
+def test_popularity_backfill_keeps_last_updated(happy_tails, pet):
+    pet_id, _ = pet
+    with happy_tails.db.engine.connect() as conn:
+        happy_tails.DATA_MIGRATIONS['pet_popularity_score'](conn)
+        conn.commit()
+    assert stored(happy_tails, pet_id) == (OLD, 0)
+
+
+def test_pet_change_still_touches_last_updated(happy_tails, pet):
+    if happy_tails.db.engine.dialect.name != 'mysql':
+        pytest.skip('last_updated is maintained by a MySQL trigger')
+    pet_id, _ = pet
+    table = happy_tails.Pet.__table__
+    happy_tails.db.session.execute(table.update().where(table.c.pet_id == pet_id).values(health_condition='Good'))
+    assert stored(happy_tails, pet_id).last_updated > OLD
@@ -0,0 +1,34 @@
+"""Ranked and popularity-score ETags must change for application writes this
+process did not make, even though no cache generation moved."""
+from sqlalchemy import insert, update
+
+
+def test_application_changes_outside_the_app_change_ranking_etags(happy_tails):
+    db = happy_tails.db
+    pet = happy_tails.Pet(name='Ranked Pet', breed='Beagle', age=2, weight=10, health_condition='Good')
+    adopter = happy_tails.Adopter(full_name='Ranked Adopter', contact_info='ranked@example.com')
+    db.session.add_all([pet, adopter])
+    db.session.commit()
+    client = happy_tails.app.test_client()
+    paths = ['/pets/ranked?limit=5', '/pets/popularity-scores']
+    etags = {path: client.get(path).headers['ETag'] for path in paths}
+    for path, etag in etags.items():
+        assert client.get(path, headers={'If-None-Match': etag}).status_code == 304
+
+    # Another worker's new application: pending count and score both move
+    application = happy_tails.AdoptionApplication.__table__
+    db.session.execute(insert(application).values(pet_id=pet.pet_id, adopter_id=adopter.adopter_id,
+                                                   status='Pending'))
+    happy_tails.refresh_pet_popularity(db.session.connection(), [pet.pet_id])
+    db.session.commit()
+    for path, etag in etags.items():
+        response = client.get(path, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        etags[path] = response.headers['ETag']
+
+    # ...and its rejection, which leaves application ids and counts alone
+    db.session.execute(update(application).where(application.c.pet_id == pet.pet_id).values(status='Rejected'))
+    happy_tails.refresh_pet_popularity(db.session.connection(), [pet.pet_id])
+    db.session.commit()
+    for path, etag in etags.items():
+        assert client.get(path, headers={'If-None-Match': etag}).status_code == 200
@@ -0,0 +1,24 @@
+"""A vaccination sweep must drop the cached popularity entries of the pets it
+updates, or /pets/<id>/popularity keeps serving their old Last-Modified."""
+from datetime import datetime
+
+from sqlalchemy import update
+
+
+def test_sweep_invalidates_cached_popularity(happy_tails):
+    db = happy_tails.db
+    pet = happy_tails.Pet(name='Sweep Pet', breed='Beagle', age=2, weight=10, health_condition='Good')
+    db.session.add(pet)
+    db.session.commit()
+    table = happy_tails.Pet.__table__
+    db.session.execute(update(table).where(table.c.pet_id == pet.pet_id).values(last_updated=datetime(2020, 1, 1)))
+    db.session.commit()
+    client = happy_tails.app.test_client()
+    before = client.get(f'/pets/{pet.pet_id}/popularity').headers['Last-Modified']
+
+    sweep = happy_tails.create_vaccination_sweep()
+    happy_tails.run_vaccination_sweep(sweep.sweep_id)
+
+    after = client.get(f'/pets/{pet.pet_id}/popularity')
+    assert after.headers['Last-Modified'] != before
+    assert db.session.get(happy_tails.Pet, pet.pet_id).health_condition == 'Needs Vaccination'